@@ -1,31 +1,75 @@
 #!/usr/bin/env python3
 import argparse
-import json
 import math
+import os
 import sys
+import threading
 import time
-from typing import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Iterator, List
 
 import boto3
+import orjson
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 RECORDS_PER_SHARD_PER_SEC = 1000  # Kinesis write limit
 
-def iter_ndjson(path: str) -> Iterator[dict]:
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            yield json.loads(line)
+# PutRecords request limits
+MAX_RECORDS_PER_BATCH = 500
+MAX_BYTES_PER_BATCH = 5 * 1024 * 1024
+MAX_BYTES_PER_RECORD = 1024 * 1024  # data + partition key
+
+MAX_PUT_RETRIES = 5
+RETRY_BASE_DELAY_S = 0.1
+RETRY_MAX_DELAY_S = 5.0
+
+WORKERS_PER_SHARD = 2     # concurrent PutRecords calls per shard
+MAX_PUT_WORKERS = 64      # cap on PutRecords threads (and pooled connections) regardless of shard count
+IN_FLIGHT_PER_WORKER = 4  # bound on queued batches (memory)
+
+ESTIMATE_SAMPLE_BYTES = 1 << 20  # sample size for estimate_events
+
+STREAM_POLL_BASE_DELAY_S = 1.0  # ensure_stream ACTIVE poll backoff
+STREAM_POLL_MAX_DELAY_S = 5.0
+
+try:
+    import msgspec  # optional: decodes only the partition key field, skipping the rest of the record
 
-def count_events(path: str) -> int:
-    c = 0
-    with open(path, "r", encoding="utf-8") as f:
+    class _PartitionKey(msgspec.Struct):
+        trip_id: Any = None
+
+    _decode_partition_key = msgspec.json.Decoder(_PartitionKey).decode
+
+    def trip_id_of(line: bytes):
+        return _decode_partition_key(line).trip_id
+except ImportError:
+    def trip_id_of(line: bytes):
+        return orjson.loads(line).get("trip_id")
+
+def iter_ndjson(path: str) -> Iterator[bytes]:
+    """Yield the raw bytes of each non-blank NDJSON line, without its line terminator."""
+    with open(path, "rb") as f:
         for line in f:
-            if line.strip():
-                c += 1
-    return c
+            line = line.rstrip(b"\r\n")
+            if not line.strip():
+                continue
+            yield line
+
+def estimate_events(path: str) -> int:
+    """Estimate the event count from the file size and the line density of the first 1 MiB.
+
+    Only used to size the stream; the send loop's count is authoritative.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        sample = f.read(ESTIMATE_SAMPLE_BYTES)
+    if not sample.strip():
+        return 0
+    if len(sample) == size:
+        # Whole file fits in the sample: count exactly
+        return sum(1 for line in sample.splitlines() if line.strip())
+    return max(1, size * sample.count(b"\n") // len(sample))
 
 def ensure_stream(kinesis, stream_name: str, shard_count: int):
     try:
@@ -35,7 +79,7 @@ def ensure_stream(kinesis, stream_name: str, shard_count: int):
         return
     except ClientError as e:
         if e.response.get("Error", {}).get("Code") != "ResourceNotFoundException":
-            print(f"Code =  {e.response.get("Error", {}).get("Code")}")
+            print(f"Code =  {e.response.get('Error', {}).get('Code')}")
             print(f"[error] Unexpected error checking stream: {e}")
             raise
 
@@ -44,39 +88,72 @@ def ensure_stream(kinesis, stream_name: str, shard_count: int):
 
     # Wait for ACTIVE
     waiter = kinesis.get_waiter("stream_exists")
-    waiter.wait(StreamName=stream_name)
-    # Extra: poll status to ACTIVE (stream_exists waiter returns when it exists; may still be CREATING)
-    while True:
-        desc = kinesis.describe_stream_summary(StreamName=stream_name)["StreamDescriptionSummary"]
-        status = desc["StreamStatus"]
-        if status == "ACTIVE":
-            print("[info] Stream is ACTIVE.")
-            break
-
+    waiter.wait(StreamName=stream_name, WaiterConfig={"Delay": 1, "MaxAttempts": 60})
+    # Extra: poll status to ACTIVE (stream_exists waiter returns when it exists; may still be CREATING).
+    # Back off 1s, 2s, 4s, ... so a quick transition is seen quickly without hammering DescribeStream.
+    delay = STREAM_POLL_BASE_DELAY_S
+    status = kinesis.describe_stream_summary(StreamName=stream_name)["StreamDescriptionSummary"]["StreamStatus"]
+    while status != "ACTIVE":
         print(f"[info] Waiting for ACTIVE, current status: {status} ...")
-        time.sleep(2)
-
-def send_records_no_batch(kinesis, stream_name: str, path: str, shard_count: int):
+        time.sleep(delay)
+        delay = min(delay * 2, STREAM_POLL_MAX_DELAY_S)
+        status = kinesis.describe_stream_summary(StreamName=stream_name)["StreamDescriptionSummary"]["StreamStatus"]
+    print("[info] Stream is ACTIVE.")
+
+def put_batch(kinesis, stream_name: str, records: List[dict]) -> int:
+    """PutRecords one batch, retrying only the failed subset with exponential backoff.
+
+    Returns the number of records Kinesis accepted.
+    """
+    accepted = 0
+    pending = records
+    for attempt in range(MAX_PUT_RETRIES + 1):
+        if attempt:
+            time.sleep(min(RETRY_BASE_DELAY_S * (2 ** (attempt - 1)), RETRY_MAX_DELAY_S))
+        resp = kinesis.put_records(StreamName=stream_name, Records=pending)
+        failed = resp.get("FailedRecordCount", 0)
+        accepted += len(pending) - failed
+        if not failed:
+            return accepted
+        # Results are positional: keep only the entries that came back with an ErrorCode
+        pending = [rec for rec, res in zip(pending, resp["Records"]) if "ErrorCode" in res]
+        print(f"[warn] {failed} record(s) failed on attempt {attempt + 1}.")
+
+    print(f"[error] Dropping {len(pending)} record(s) after {MAX_PUT_RETRIES} retries.")
+    return accepted
+
+def put_workers(shard_count: int) -> int:
+    """Concurrent PutRecords workers for a stream of shard_count shards"""
+    return min(shard_count * WORKERS_PER_SHARD, MAX_PUT_WORKERS)
+
+def send_records(kinesis, stream_name: str, path: str, shard_count: int):
     # throttle to shard_count * 1000 rec/s
     max_rate = shard_count * RECORDS_PER_SHARD_PER_SEC
     sent = 0
     window_start = time.perf_counter()
 
-    for rec in iter_ndjson(path):
-        # Partition key: trip_id
-        pk_val = rec.get("trip_id")
-        if pk_val is None:
-            # Fallback if trip_id is missing (shouldn't happen based on your file)
-            pk_val = str(hash(json.dumps(rec, sort_keys=True)))
-            print(f"[warn] trip_id missing in record, using hash as partition key: {pk_val}")
-
-        data_bytes = (json.dumps(rec) + "\n").encode("utf-8")
-
-        # PutRecord (no batch)
-        kinesis.put_record(StreamName=stream_name, Data=data_bytes, PartitionKey=str(pk_val))
-        sent += 1
-
-        # Simple token bucket: enforce records/sec cap
+    batch: List[dict] = []
+    batch_bytes = 0
+
+    # Keep ~2 PutRecords calls in flight per shard, up to MAX_PUT_WORKERS; the boto3 client is shared (thread-safe).
+    # A bounded semaphore caps outstanding batches so the reader cannot run ahead of the network.
+    workers = put_workers(shard_count)
+    slots = threading.BoundedSemaphore(workers * IN_FLIGHT_PER_WORKER)
+    sent_lock = threading.Lock()
+
+    def on_done(fut: Future):
+        nonlocal sent
+        try:
+            accepted = fut.result()
+        except Exception as e:
+            print(f"[error] PutRecords batch failed: {e}")
+            accepted = 0
+        with sent_lock:
+            sent += accepted
+        slots.release()
+
+    def throttle():
+        # Simple token bucket on records accepted across workers: enforce records/sec cap
         elapsed = time.perf_counter() - window_start
         # allowed so far:
         allowed = max_rate * elapsed
@@ -86,33 +163,72 @@ def send_records_no_batch(kinesis, stream_name: str, path: str, shard_count: int
             if sleep_s > 0:
                 time.sleep(sleep_s)
 
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="KinesisPut") as ex:
+        def flush():
+            nonlocal batch, batch_bytes
+            throttle()
+            slots.acquire()
+            ex.submit(put_batch, kinesis, stream_name, batch).add_done_callback(on_done)
+            batch, batch_bytes = [], 0
+
+        for line in iter_ndjson(path):
+            # Partition key: trip_id (the only field read; the record itself is forwarded as-is)
+            pk_val = trip_id_of(line)
+            if pk_val is None:
+                # Fallback if trip_id is missing (shouldn't happen based on your file)
+                pk_val = str(hash(line))
+                print(f"[warn] trip_id missing in record, using hash as partition key: {pk_val}")
+            pk = str(pk_val)
+
+            data_bytes = line + b"\n"
+
+            # Kinesis counts the partition key against the per-record and per-request limits.
+            # Oversized records would fail the whole PutRecords call, so reject them up front.
+            rec_bytes = len(data_bytes) + len(pk.encode("utf-8"))
+            if rec_bytes > MAX_BYTES_PER_RECORD:
+                print(f"[warn] Skipping record with partition key {pk}: {rec_bytes} bytes exceeds 1 MiB limit")
+                continue
+
+            if batch and (len(batch) >= MAX_RECORDS_PER_BATCH or batch_bytes + rec_bytes > MAX_BYTES_PER_BATCH):
+                flush()
+
+            batch.append({"Data": data_bytes, "PartitionKey": pk})
+            batch_bytes += rec_bytes
+
+        if batch:
+            flush()
+
     # Final gentle wait to avoid abrupt close in environments
     print(f"[done] Sent {sent} records to '{stream_name}' using {shard_count} shard(s).")
 
 def main():
-    ap = argparse.ArgumentParser(description="Send NDJSON events to Kinesis (no batching).")
+    ap = argparse.ArgumentParser(description="Send NDJSON events to Kinesis (batched PutRecords).")
     ap.add_argument("--file", required=True, help="Path to NDJSON file")
     ap.add_argument("--stream", required=True, help="Kinesis stream name")
     ap.add_argument("--region", required=True, help="AWS region, e.g. us-east-1")
     ap.add_argument("--profile", default=None, help="AWS profile (optional)")
     args = ap.parse_args()
 
-    # Session
-    if args.profile:
-        boto3.setup_default_session(profile_name=args.profile)
-    kinesis = boto3.client("kinesis", region_name=args.region)
-
-    total = count_events(args.file)
+    total = estimate_events(args.file)
     if total == 0:
         print("[error] No events found in file.")
         sys.exit(1)
 
-    # Decide shards solely based on total events (ceil(total/1000))
+    # Decide shards solely based on estimated events (ceil(total/1000))
     shard_count = max(1, math.ceil(total / RECORDS_PER_SHARD_PER_SEC))
-    print(f"[plan] Total events: {total} -> shard_count = {shard_count}")
+    print(f"[plan] Estimated events: ~{total} -> shard_count = {shard_count}")
+
+    # Session (connection pool sized for the concurrent PutRecords workers)
+    if args.profile:
+        boto3.setup_default_session(profile_name=args.profile)
+    kinesis = boto3.client(
+        "kinesis",
+        region_name=args.region,
+        config=Config(max_pool_connections=max(10, put_workers(shard_count))),
+    )
 
     ensure_stream(kinesis, args.stream, shard_count)
-    send_records_no_batch(kinesis, args.stream, args.file, shard_count)
+    send_records(kinesis, args.stream, args.file, shard_count)
 
 if __name__ == "__main__":
     main()
@@ -6,28 +6,44 @@
 import os
 import io
 import time
-import json
 import math
 import threading
-from typing import List, Tuple, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import accumulate
+from typing import Iterator, List, Tuple, Optional
 from dotenv import load_dotenv
 
 from boto3 import session
 from botocore import UNSIGNED
 from botocore.client import Config
 
+import cramjam
+import orjson
 import snappy
 import FileFormatDetection
-from TripEvent import TripEvent
 import AdaptTimeOption  # noqa: F401
 
 # Meteostat for weather
 from meteostat import Hourly, Point
 from datetime import datetime, timedelta, timezone
+import numpy as np
 import pandas as pd
 
 import urllib.request
 
+try:
+    from diskcache import Cache  # optional: persists API response caches across runs
+except ImportError:
+    Cache = None
+
+_MISSING = object()
+
+RANGE_MIN_PART_BYTES = 8 * 1024 * 1024  # smallest byte range worth a separate GET
+
+COORD_FIELDS = ("pickup_lat", "pickup_lon", "dropoff_lat", "dropoff_lon")
+
 
 class NYCTaxiEventReader:
     """
@@ -47,6 +63,10 @@ class NYCTaxiEventReader:
         max_files: int = 2,
         output_dir: str = "./snappy_decompressed_events",
         google_api_key: Optional[str] = None,
+        max_workers: int = 32,
+        range_parts: int = 8,
+        cache_dir: Optional[str] = "./cache",
+        route_workers: int = 50,
     ) -> None:
         self.region = region
         self.bucket_name = bucket_name
@@ -54,11 +74,34 @@ class NYCTaxiEventReader:
         self.max_files = max_files
         self.output_dir = output_dir
         self.google_api_key = google_api_key
+        self.max_workers = max_workers
+        self.range_parts = range_parts
+        self.cache_dir = cache_dir
 
         # Session/resource for listing
         self._session = session.Session()
         self._s3_resource = self._session.resource("s3", region_name=self.region)
         self._bucket = self._s3_resource.Bucket(self.bucket_name)
+        # One client shared by all download workers (boto3 clients are thread-safe);
+        # each worker may hold range_parts connections at once.
+        self._s3_client = self._session.client(
+            "s3", region_name=self.region,
+            config=Config(max_pool_connections=self.max_workers * self.range_parts),
+        )
+
+        # Response caches for external APIs, keyed by rounded coordinates.
+        # Persistent across runs when diskcache is installed; in-memory otherwise.
+        # Weather needs no in-memory layer here: the lru_cache on _weather_cell already is one.
+        if cache_dir and Cache is not None:
+            self._route_cache = Cache(os.path.join(cache_dir, "routes"))
+            self._weather_cache = Cache(os.path.join(cache_dir, "weather"))
+        else:
+            self._route_cache = {}
+            self._weather_cache = None
+
+        # Directions calls are blocking HTTP; one pool shared by all files bounds
+        # the total number of requests in flight against the Google API.
+        self._route_pool = ThreadPoolExecutor(max_workers=route_workers, thread_name_prefix="Routes")
 
         # Stats
         self._stats_lock = threading.Lock()
@@ -87,70 +130,113 @@ class NYCTaxiEventReader:
         return out
 
     @staticmethod
-    def _download_and_decompress(region: str, obj_summary) -> Tuple[io.BytesIO, float, int]:
+    def _iter_ranges(s3_client, bucket: str, key: str, size: int, parts: int) -> Iterator[bytes]:
+        """GET an object as `parts` concurrent byte ranges, yielding them in order as they land."""
+        step = -(-size // parts)
+
+        def fetch(start: int) -> bytes:
+            end = min(start + step, size) - 1
+            resp = s3_client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")
+            return resp["Body"].read()
+
+        with ThreadPoolExecutor(max_workers=parts) as ex:
+            pending = deque(ex.submit(fetch, start) for start in range(0, size, step))
+            while pending:
+                # popleft drops our reference so each compressed range is freed once consumed
+                yield pending.popleft().result()
+
+    @staticmethod
+    def _download_and_decompress(s3_client, obj_summary, range_parts: int = 1) -> Tuple[io.BytesIO, float, int]:
         start = time.time()
-        sess = session.Session()
-        s3_client = sess.client("s3", region_name=region)
-        try:
+        size = obj_summary.size
+        dst = io.BytesIO()
+        # Only split objects big enough that each range is worth its own request
+        parts = min(range_parts, size // RANGE_MIN_PART_BYTES)
+        if parts > 1:
+            # Decompress range i while ranges i+1.. are still downloading
+            decompressor = snappy.StreamDecompressor()
+            for chunk in NYCTaxiEventReader._iter_ranges(
+                s3_client, obj_summary.bucket_name, obj_summary.key, size, parts
+            ):
+                dst.write(decompressor.decompress(chunk))
+            # python-snappy keeps an incomplete last frame buffered instead of raising
+            if decompressor.remains:
+                raise snappy.UncompressError(f"{obj_summary.key}: compressed stream ended mid-frame")
+        else:
+            # One Rust call decodes every frame (no per-frame Python read/write loop)
             resp = s3_client.get_object(Bucket=obj_summary.bucket_name, Key=obj_summary.key)
-            payload = resp["Body"].read()
             size = resp["ContentLength"]
-            src = io.BytesIO(payload)
-            dst = io.BytesIO()
-            snappy.stream_decompress(src=src, dst=dst)
-            dst.seek(0)
-            read_time = max(0.0, time.time() - start)
-            return dst, read_time, size
-        finally:
-            try:
-                s3_client.close()
-            except Exception:
-                pass
+            dst.write(cramjam.snappy.decompress(resp["Body"].read()))
+        dst.seek(0)
+        read_time = max(0.0, time.time() - start)
+        return dst, read_time, size
 
     # ----------------------
     # Distance & Weather
     # ----------------------
     @staticmethod
-    def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        """Great-circle distance (km) on WGS-84 sphere."""
+    def _haversine_km_batch(lat1: np.ndarray, lon1: np.ndarray,
+                            lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+        """Great-circle distance (km) on WGS-84 sphere over coordinate arrays; NaN in, NaN out."""
         R = 6371.0088
-        φ1, φ2 = math.radians(lat1), math.radians(lat2)
+        φ1, φ2 = np.radians(lat1), np.radians(lat2)
         dφ = φ2 - φ1
-        dλ = math.radians(lon2 - lon1)
-        a = math.sin(dφ / 2) ** 2 + math.cos(φ1) * math.cos(φ2) * math.sin(dλ / 2) ** 2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        dλ = np.radians(lon2 - lon1)
+        a = np.sin(dφ / 2) ** 2 + np.cos(φ1) * np.cos(φ2) * np.sin(dλ / 2) ** 2
+        # asin form: one sqrt + arcsin instead of two sqrt + arctan2. The arctan2 form only
+        # matters near-antipodal (a -> 1), which city-scale trips never are.
+        c = 2 * np.arcsin(np.sqrt(a))
         return R * c
 
+    @staticmethod
+    def _coord(v) -> float:
+        """Numeric coordinate as float, NaN for missing/non-numeric values."""
+        return float(v) if isinstance(v, (int, float)) else np.nan
+
     # --- Polyline decoding ---
     @staticmethod
-    def _decode_polyline(polyline_str: str) -> List[Tuple[float, float]]:
-        """Decode a Google encoded polyline into list of (lat, lon)."""
-        coords = []
-        index, lat, lon = 0, 0, 0
-        while index < len(polyline_str):
-            for coord in [lat, lon]:
-                shift, result = 0, 0
-                while True:
-                    b = ord(polyline_str[index]) - 63
-                    index += 1
-                    result |= (b & 0x1F) << shift
-                    shift += 5
-                    if b < 0x20:
-                        break
-                dcoord = ~(result >> 1) if (result & 1) else (result >> 1)
-                if coord is lat:
-                    lat += dcoord
-                    coord = lat
-                else:
-                    lon += dcoord
-                    coord = lon
-            coords.append((lat / 1e5, lon / 1e5))
-        return coords
+    @lru_cache(maxsize=4096)
+    def _decode_polyline(polyline_str: str) -> Tuple[Tuple[float, float], ...]:
+        """Decode a Google encoded polyline into (lat, lon) pairs.
+
+        Cached: alternates and repeated OD pairs return the same overview polylines.
+        """
+        # Varint-decode every delta in one pass over the raw bytes, then
+        # prefix-sum the lat/lon streams in C via itertools.accumulate.
+        deltas = []
+        shift = result = 0
+        for b in polyline_str.encode("ascii"):
+            b -= 63
+            result |= (b & 0x1F) << shift
+            if b < 0x20:
+                deltas.append(~(result >> 1) if (result & 1) else (result >> 1))
+                shift = result = 0
+            else:
+                shift += 5
+        return tuple(
+            (lat / 1e5, lon / 1e5)
+            for lat, lon in zip(accumulate(deltas[0::2]), accumulate(deltas[1::2]))
+        )
 
     def _google_routes(self, p_lat, p_lon, d_lat, d_lon):
-        """Fetch all Google driving routes with alternatives."""
+        """Google driving routes for an OD pair, cached on coordinates rounded to ~11 m."""
         if not self.google_api_key:
             return None
+        key = self._route_key(p_lat, p_lon, d_lat, d_lon)
+        routes = self._route_cache.get(key)
+        if routes is None:
+            routes = self._fetch_google_routes(p_lat, p_lon, d_lat, d_lon)
+            # Only successes are cached; errors and empty answers are retried next time
+            if routes is not None:
+                self._route_cache[key] = routes
+        return routes
+
+    @staticmethod
+    def _route_key(p_lat, p_lon, d_lat, d_lon) -> Tuple[float, float, float, float]:
+        return round(p_lat, 4), round(p_lon, 4), round(d_lat, 4), round(d_lon, 4)
+
+    def _fetch_google_routes(self, p_lat, p_lon, d_lat, d_lon):
+        """Fetch all Google driving routes with alternatives."""
         url = (
             "https://maps.googleapis.com/maps/api/directions/json?"
             f"origin={p_lat},{p_lon}&destination={d_lat},{d_lon}"
@@ -158,7 +244,7 @@ class NYCTaxiEventReader:
         )
         try:
             with urllib.request.urlopen(url, timeout=8) as resp:
-                out = json.loads(resp.read().decode())
+                out = orjson.loads(resp.read())
                 routes = out.get("routes", [])
                 result = []
                 for r in routes:
@@ -208,87 +294,93 @@ class NYCTaxiEventReader:
                 # Handle Feb 29 -> Feb 28 next year
                 return dt.replace(month=2, day=28, year=dt.year + 1)
 
-    def _historic_weather(self, lat: float, lon: float, when_utc: datetime):
-        """Fetch hourly weather at location/time via Meteostat with conditions (pd.NA-safe)."""
+    def _weather_for_key(self, key: Tuple[float, float, int]):
+        """Weather for an already-snapped (lat, lon, hour_epoch) key, via the response cache."""
         try:
-            # Ensure UTC-aware then make naive (Meteostat treats naive as UTC)
-            if when_utc.tzinfo is None:
-                when_utc = when_utc.replace(tzinfo=timezone.utc)
-            else:
-                when_utc = when_utc.astimezone(timezone.utc)
+            if self._weather_cache is None:
+                return self._weather_cell(*key)
+            weather = self._weather_cache.get(key, _MISSING)
+            if weather is _MISSING:
+                weather = self._weather_cell(*key)
+                self._weather_cache[key] = weather
+            return weather
 
-            start_aware = when_utc.replace(minute=0, second=0, microsecond=0)
-            start = start_aware.replace(tzinfo=None)
-            end = (start_aware + timedelta(hours=1)).replace(tzinfo=None)
+        except Exception as e:
+            print(f"Weather error: {e}")
+            return None
+
+    @staticmethod
+    @lru_cache(maxsize=100_000)
+    def _weather_cell(lat: float, lon: float, hour_epoch: int):
+        """Meteostat lookup for one grid cell and hour. Errors propagate (and are not cached)."""
+        # Naive UTC bounds (Meteostat treats naive as UTC)
+        start = datetime.fromtimestamp(hour_epoch, tz=timezone.utc).replace(tzinfo=None)
+        end = start + timedelta(hours=1)
+
+        loc = Point(lat, lon)
+        df = Hourly(loc, start, end, model=True).fetch()
+        if df is None or df.empty:
+            return None
+        row = df.iloc[0]
 
-            loc = Point(lat, lon)
-            df = Hourly(loc, start, end, model=True).fetch()
-            if df is None or df.empty:
+        # ---- helpers that won't choke on pd.NA / NaN / None ----
+        def to_float(x):
+            # Return None for pd.NA/NaN/None; else float(x)
+            if pd.isna(x):
+                return None
+            try:
+                return float(x)
+            except (TypeError, ValueError):
                 return None
-            row = df.iloc[0]
 
-            # ---- helpers that won't choke on pd.NA / NaN / None ----
-            def to_float(x):
-                # Return None for pd.NA/NaN/None; else float(x)
-                if pd.isna(x):
-                    return None
-                try:
-                    return float(x)
-                except (TypeError, ValueError):
-                    return None
+        def to_int(x):
+            if pd.isna(x):
+                return None
+            try:
+                return int(x)
+            except (TypeError, ValueError):
+                return None
 
-            def to_int(x):
-                if pd.isna(x):
-                    return None
-                try:
-                    return int(x)
-                except (TypeError, ValueError):
-                    return None
-
-            # Meteostat condition code mapping
-            condition_map = {
-                0: "Clear", 1: "Mainly clear", 2: "Partly cloudy", 3: "Overcast",
-                45: "Fog", 48: "Rime fog",
-                51: "Light drizzle", 53: "Moderate drizzle", 55: "Dense drizzle",
-                61: "Slight rain", 63: "Moderate rain", 65: "Heavy rain",
-                66: "Light freezing rain", 67: "Heavy freezing rain",
-                71: "Slight snow", 73: "Moderate snow", 75: "Heavy snow",
-                80: "Rain showers", 81: "Moderate rain showers", 82: "Violent rain showers",
-                95: "Thunderstorm", 96: "Thunderstorm with hail", 99: "Severe thunderstorm with hail"
-            }
-
-            temp_c = to_float(row.get("temp"))
-
-            val = row.get("prcp")
-            if val is None or pd.isna(val):
-                precip_mm = 0.0
-            elif isinstance(val, str) and val.strip().lower() in ("", "na", "nan", "null", "none"):
+        # Meteostat condition code mapping
+        condition_map = {
+            0: "Clear", 1: "Mainly clear", 2: "Partly cloudy", 3: "Overcast",
+            45: "Fog", 48: "Rime fog",
+            51: "Light drizzle", 53: "Moderate drizzle", 55: "Dense drizzle",
+            61: "Slight rain", 63: "Moderate rain", 65: "Heavy rain",
+            66: "Light freezing rain", 67: "Heavy freezing rain",
+            71: "Slight snow", 73: "Moderate snow", 75: "Heavy snow",
+            80: "Rain showers", 81: "Moderate rain showers", 82: "Violent rain showers",
+            95: "Thunderstorm", 96: "Thunderstorm with hail", 99: "Severe thunderstorm with hail"
+        }
+
+        temp_c = to_float(row.get("temp"))
+
+        val = row.get("prcp")
+        if val is None or pd.isna(val):
+            precip_mm = 0.0
+        elif isinstance(val, str) and val.strip().lower() in ("", "na", "nan", "null", "none"):
+            precip_mm = 0.0
+        else:
+            try:
+                precip_mm = float(val)
+            except (TypeError, ValueError):
                 precip_mm = 0.0
-            else:
-                try:
-                    precip_mm = float(val)
-                except (TypeError, ValueError):
-                    precip_mm = 0.0
-
-            # wind speed in m/s -> km/h
-            wspd_ms = row.get("wspd")
-            wind_kph = to_float(wspd_ms)
-            if wind_kph is not None:
-                wind_kph *= 3.6
-
-            coco = to_int(row.get("coco"))
-            condition = condition_map.get(coco, "Unknown") if coco is not None else "Unknown"
-
-            return {
-                "temp_c": temp_c,
-                "precip_mm": precip_mm,
-                "wind_kph": wind_kph,
-                "condition": condition
-            }
 
-        except Exception as e:
-            print(f"Weather error: {e}")
-            return None
+        # wind speed in m/s -> km/h
+        wspd_ms = row.get("wspd")
+        wind_kph = to_float(wspd_ms)
+        if wind_kph is not None:
+            wind_kph *= 3.6
+
+        coco = to_int(row.get("coco"))
+        condition = condition_map.get(coco, "Unknown") if coco is not None else "Unknown"
+
+        return {
+            "temp_c": temp_c,
+            "precip_mm": precip_mm,
+            "wind_kph": wind_kph,
+            "condition": condition
+        }
 
     # ----------------------
     # Processing
@@ -297,7 +389,7 @@ class NYCTaxiEventReader:
         thread_name = threading.current_thread().name
         print(f"{thread_name} - Starting {obj_summary.key}")
 
-        stream, _, _ = self._download_and_decompress(self.region, obj_summary)
+        stream, _, _ = self._download_and_decompress(self._s3_client, obj_summary, self.range_parts)
         stream.seek(0)
 
         os.makedirs(self.output_dir, exist_ok=True)
@@ -306,61 +398,103 @@ class NYCTaxiEventReader:
         events = 0
         start_proc = time.time()
 
-        with open(out_path, "w", encoding="utf-8", buffering=1024 * 1024) as fh:
-            count = 0
-            for raw in stream:
-                if count >= 10:
-                    break
-                count = count + 1
+        # Pass 1: parse events and shift their timestamps.
+        # Bounds are reduced per file and merged into the shared stats once at the end.
+        parsed = []
+        local_earliest = local_latest = None
+        # Split the decompressed buffer in one C-level pass instead of a readline per event
+        for raw in stream.getvalue().split(b"\n"):
+            if not raw:
+                continue
+            try:
+                obj = orjson.loads(raw)  # orjson reads the UTF-8 bytes directly
+
+                # Same value as TripEvent.timestamp, without parsing the line a second time
+                ts_ms = datetime.fromisoformat(obj["dropoff_datetime"].rstrip("Z")).timestamp() * 1000
+                # Original event time (UTC-aware), then shift by +1 calendar year
+                when_utc = datetime.fromtimestamp(ts_ms / 1000.0, tz=timezone.utc) if ts_ms else None
+                when_utc_shifted = self._add_one_year(when_utc) if when_utc else None
+
+                # Use the shifted timestamp everywhere downstream (stats + weather)
+                ts_ms_shifted = int(when_utc_shifted.timestamp() * 1000) if when_utc_shifted else None
+                if ts_ms_shifted is not None:
+                    if local_earliest is None or ts_ms_shifted < local_earliest:
+                        local_earliest = ts_ms_shifted
+                    if local_latest is None or ts_ms_shifted > local_latest:
+                        local_latest = ts_ms_shifted
+
+                parsed.append((obj, ts_ms_shifted))
+            except Exception as e:
+                print(f"{obj_summary.key}: error {e}")
+
+        # Columnar (one float64 array per field) view of what the enrichment needs,
+        # so distance and weather-key snapping run as whole-column NumPy ops.
+        df = pd.DataFrame(
+            [[self._coord(obj.get(k)) for k in COORD_FIELDS] + [ts_ms] for obj, ts_ms in parsed],
+            columns=[*COORD_FIELDS, "ts_ms"],
+            dtype=np.float64,
+        )
+        df["straight_line_km"] = self._haversine_km_batch(
+            df["pickup_lat"].to_numpy(), df["pickup_lon"].to_numpy(),
+            df["dropoff_lat"].to_numpy(), df["dropoff_lon"].to_numpy(),
+        ).round(4)
+
+        # Issue Directions requests for every distinct OD pair concurrently
+        route_futures = {}
+        if self.google_api_key:
+            for (obj, _), km in zip(parsed, df["straight_line_km"]):
+                if np.isnan(km):
+                    continue
+                od = (obj["pickup_lat"], obj["pickup_lon"], obj["dropoff_lat"], obj["dropoff_lon"])
+                key = self._route_key(*od)
+                if key not in route_futures:
+                    route_futures[key] = self._route_pool.submit(self._google_routes, *od)
+
+        # Weather keys: pickup snapped to ~1 km, shifted time floored to the hour.
+        # Only distinct keys hit the cache/Meteostat; rows then pick up their result.
+        weather_keys = pd.DataFrame({
+            "lat": df["pickup_lat"].round(2),
+            "lon": df["pickup_lon"].round(2),
+            "hour": (df["ts_ms"] // 3_600_000) * 3600,
+        }).dropna()
+        weather_by_key = {
+            key: self._weather_for_key(key)
+            for key in ((lat, lon, int(hour))
+                        for lat, lon, hour in weather_keys.drop_duplicates().itertuples(index=False, name=None))
+        }
+        weather_col = [None] * len(df)
+        for i, lat, lon, hour in weather_keys.itertuples(name=None):
+            weather_col[i] = weather_by_key[(lat, lon, int(hour))]
+
+        # Pass 2: enrich and write
+        with open(out_path, "wb", buffering=1024 * 1024) as fh:
+            for (obj, _), km, weather in zip(parsed, df["straight_line_km"].tolist(), weather_col):
                 try:
-                    line = raw.decode("unicode_escape")
-                    obj = json.loads(line)
-
-                    ev = TripEvent(line)
-                    ts_ms = ev.timestamp
-                    # Original event time (UTC-aware), then shift by +1 calendar year
-                    when_utc = datetime.fromtimestamp(ts_ms / 1000.0, tz=timezone.utc) if ts_ms else None
-                    when_utc_shifted = self._add_one_year(when_utc) if when_utc else None
-
-                    # Use the shifted timestamp everywhere downstream (stats + weather)
-                    ts_ms_shifted = int(when_utc_shifted.timestamp() * 1000) if when_utc_shifted else None
-                    if ts_ms_shifted is not None:
-                        with self._stats_lock:
-                            if self.earliest_time is None or ts_ms_shifted < self.earliest_time:
-                                self.earliest_time = ts_ms_shifted
-                            if self.latest_time is None or ts_ms_shifted > self.latest_time:
-                                self.latest_time = ts_ms_shifted
-
-                    p_lat, p_lon = obj.get("pickup_lat"), obj.get("pickup_lon")
-                    d_lat, d_lon = obj.get("dropoff_lat"), obj.get("dropoff_lon")
-
-                    straight_line_km = None
-                    if all(isinstance(v, (int, float)) for v in (p_lat, p_lon, d_lat, d_lon)):
-                        straight_line_km = round(self._haversine_km(p_lat, p_lon, d_lat, d_lon), 4)
+                    has_coords = not math.isnan(km)
 
                     routes_google = None
-                    if all(isinstance(v, (int, float)) for v in (p_lat, p_lon, d_lat, d_lon)):
-                        routes_google = self._google_routes(p_lat, p_lon, d_lat, d_lon)
-
-                    weather = None
-                    if when_utc_shifted and isinstance(p_lat, (int, float)) and isinstance(p_lon, (int, float)):
-                        weather = self._historic_weather(p_lat, p_lon, when_utc_shifted)
-
+                    if has_coords and route_futures:
+                        routes_google = route_futures[self._route_key(
+                            obj["pickup_lat"], obj["pickup_lon"], obj["dropoff_lat"], obj["dropoff_lon"]
+                        )].result()
 
-                    obj["straight_line_km"] = straight_line_km
+                    obj["straight_line_km"] = km if has_coords else None
                     obj["google_routes"] = routes_google
                     obj["weather_at_pickup"] = weather
 
-                    fh.write(json.dumps(obj, separators=(",", ":")) + "\n")
+                    fh.write(orjson.dumps(obj) + b"\n")
                     events += 1
                 except Exception as e:
                     print(f"{obj_summary.key}: error {e}")
 
-
         proc_time = max(0.0, time.time() - start_proc)
         with self._stats_lock:
             self.total_events += events
             self.total_processing_time += proc_time
+            if local_earliest is not None and (self.earliest_time is None or local_earliest < self.earliest_time):
+                self.earliest_time = local_earliest
+            if local_latest is not None and (self.latest_time is None or local_latest > self.latest_time):
+                self.latest_time = local_latest
 
         return out_path, events, proc_time, thread_name
 
@@ -368,17 +502,17 @@ class NYCTaxiEventReader:
     # Orchestration
     # ----------------------
     def run(self) -> None:
-        objs = self.list_s3_objects()
-        if not objs:
-            print("No S3 objects found")
-            return
-        threads = []
-        for i, obj in enumerate(objs, start=1):
-            th = threading.Thread(target=self._thread_wrapper, args=(obj,), name=f"Thread-{i}")
-            threads.append(th)
-            th.start()
-        for th in threads:
-            th.join()
+        try:
+            objs = self.list_s3_objects()
+            if not objs:
+                print("No S3 objects found")
+                return
+            workers = min(self.max_workers, len(objs))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Thread") as ex:
+                list(ex.map(self._thread_wrapper, objs))
+        finally:
+            # Every file has collected its routes by now; don't leave the Directions threads idling
+            self._route_pool.shutdown()
 
     def _thread_wrapper(self, obj):
         try:
@@ -23,7 +23,7 @@ import snappy
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import FileFormatDetection
 
-from TripEvent import TripEvent
+from TripEvent import event_timestamp
 import AdaptTimeOption
 
 REGION = "us-east-1"
@@ -31,16 +31,7 @@ BUCKET_NAME = "aws-bigdata-blog"
 OBJECT_PREFIX = "artifacts/flink-refarch/data/nyc-tlc-trips.snz/"
 MAX_FILES = 20  # max files to download
 OUTPUT_DIR = "./snappy_decompressed_events"
-MAX_WORKERS = 20  # threads for parallel downloads
-
-# ----------------------
-# Globals for simple stats
-# ----------------------
-stats_lock = threading.Lock()
-total_events = 0
-total_processing_time = 0.0
-earliest_time = None
-latest_time = None
+MAX_WORKERS = min(MAX_FILES, 2 * (os.cpu_count() or 1))  # threads: parsing is CPU-bound, more just thrash the GIL
 
 session_ = session.Session()
 s3_resource = session_.resource('s3', region_name=REGION)
@@ -95,12 +86,10 @@ def process_object(obj_summary, s3_client):
     - download + decompress
     - parse each line to extract timestamp (ms) but DO NOT convert
     - write all raw lines to a dedicated output file
-    - update global stats
+    - return this file's stats for main() to reduce
     """
     print(f"Thread Name: {threading.current_thread().name} - Starting processing for {obj_summary.key}")
 
-    global total_events, total_processing_time, earliest_time, latest_time
-
     key = obj_summary.key
     stream, read_time, size = download_and_decompress(s3_client, obj_summary)
     bps = (size / read_time) if read_time > 0 else float("inf")
@@ -115,22 +104,21 @@ def process_object(obj_summary, s3_client):
     out_path = os.path.join(OUTPUT_DIR, safe_filename_from_key(key, ".ndjson"))
 
     events = 0
+    local_min = local_max = None  # this file's bounds; main() merges them across files
     start_proc = time.time()
 
     with open(out_path, "w", encoding="utf-8", buffering=1024 * 1024) as fh:
         for raw in stream:
             try:
-                line = raw.decode("unicode_escape")
-                ev = TripEvent(line)
-                ts_ms = ev.timestamp  # keep raw millis
+                line = raw.decode("utf-8")  # plain UTF-8: JSON escapes like \" must stay as written
+                ts_ms = event_timestamp(raw)  # keep raw millis
 
-                # update bounds
+                # update local bounds (no lock per line)
                 if ts_ms is not None:
-                    with stats_lock:
-                        if earliest_time is None or ts_ms < earliest_time:
-                            earliest_time = ts_ms
-                        if latest_time is None or ts_ms > latest_time:
-                            latest_time = ts_ms
+                    if local_min is None or ts_ms < local_min:
+                        local_min = ts_ms
+                    if local_max is None or ts_ms > local_max:
+                        local_max = ts_ms
 
                 # write the original line
                 if not line.endswith("\n"):
@@ -150,13 +138,10 @@ def process_object(obj_summary, s3_client):
         fh.close()
 
     proc_time = max(0.0, time.time() - start_proc)
-    with stats_lock:
-        total_events += events
-        total_processing_time += proc_time
 
     thr = (events / proc_time) if proc_time > 0 else 0.0
     print(f"Wrote {events} events to {out_path} | ProcTime {proc_time:.2f}s | {thr:.2f} ev/s")
-    return out_path, events, proc_time, threading.current_thread().name
+    return out_path, events, proc_time, local_min, local_max, threading.current_thread().name
 
 
 def main():
@@ -172,20 +157,33 @@ def main():
     t0 = time.time()
     outputs = []
 
+    # Stats reduced from each worker's result (no shared state, no lock)
+    total_events = 0
+    total_processing_time = 0.0
+    earliest_time = None
+    latest_time = None
+
     # Get the current thread object
     current_thread = threading.current_thread()
     print(f"Thread Name: {current_thread.name}")
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(objs))) as pool:
         futures = {pool.submit(process_object, obj, s3_client): obj.key for obj in objs}
         for fut in as_completed(futures):
             key = futures[fut]
             try:
-                out_path, events, proc_time, threadname = fut.result()
-                print(f"Thread Name: {threadname} | Completed processing {key}: {events} events in {proc_time:.2f}s")
-                outputs.append(out_path)
+                out_path, events, proc_time, local_min, local_max, threadname = fut.result()
             except Exception as e:
                 print(f"Failed processing {key}: {e}")
+                continue
+            print(f"Thread Name: {threadname} | Completed processing {key}: {events} events in {proc_time:.2f}s")
+            outputs.append(out_path)
+            total_events += events
+            total_processing_time += proc_time
+            if local_min is not None and (earliest_time is None or local_min < earliest_time):
+                earliest_time = local_min
+            if local_max is not None and (latest_time is None or local_max > latest_time):
+                latest_time = local_max
 
     print(f"Thread Name: {current_thread.name}")
 
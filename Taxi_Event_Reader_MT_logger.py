@@ -16,7 +16,7 @@ import snappy
 from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
 import FileFormatDetection
 
-from TripEvent import TripEvent
+from TripEvent import event_timestamp
 import AdaptTimeOption
 
 REGION = "us-east-1"
@@ -24,18 +24,9 @@ BUCKET_NAME = "aws-bigdata-blog"
 OBJECT_PREFIX = "artifacts/flink-refarch/data/nyc-tlc-trips.snz/"
 MAX_FILES = 20
 OUTPUT_DIR = "./snappy_decompressed_events"
-MAX_WORKERS = min(10, MAX_FILES)  # Reduced from 20, don't exceed file count
+MAX_WORKERS = min(MAX_FILES, 2 * (os.cpu_count() or 1))  # Don't exceed file count; parsing is CPU-bound, so ~2 threads per core
 DOWNLOAD_TIMEOUT = 300  # 5 minutes timeout for downloads
 
-# ----------------------
-# Globals for simple stats
-# ----------------------
-stats_lock = threading.Lock()
-total_events = 0
-total_processing_time = 0.0
-earliest_time = None
-latest_time = None
-
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(threadName)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -114,8 +105,6 @@ def process_object(obj_summary):
     thread_name = threading.current_thread().name
     logger.info(f"Starting processing for {obj_summary.key}")
 
-    global total_events, total_processing_time, earliest_time, latest_time
-
     try:
         key = obj_summary.key
         stream, read_time, size = download_and_decompress(obj_summary)
@@ -132,6 +121,7 @@ def process_object(obj_summary):
         out_path = os.path.join(OUTPUT_DIR, safe_filename_from_key(key, ".ndjson"))
 
         events = 0
+        local_min = local_max = None  # this file's bounds; main() merges them across files
         start_proc = time.time()
 
         # Use smaller buffer and ensure proper cleanup
@@ -139,17 +129,15 @@ def process_object(obj_summary):
             try:
                 for raw in stream:
                     try:
-                        line = raw.decode("unicode_escape")
-                        ev = TripEvent(line)
-                        ts_ms = ev.timestamp
+                        line = raw.decode("utf-8")  # plain UTF-8: JSON escapes like \" must stay as written
+                        ts_ms = event_timestamp(raw)
 
-                        # Update bounds with lock
+                        # Update local bounds (no lock per line)
                         if ts_ms is not None:
-                            with stats_lock:
-                                if earliest_time is None or ts_ms < earliest_time:
-                                    earliest_time = ts_ms
-                                if latest_time is None or ts_ms > latest_time:
-                                    latest_time = ts_ms
+                            if local_min is None or ts_ms < local_min:
+                                local_min = ts_ms
+                            if local_max is None or ts_ms > local_max:
+                                local_max = ts_ms
 
                         # Write line
                         if not line.endswith("\n"):
@@ -174,15 +162,10 @@ def process_object(obj_summary):
 
         proc_time = max(0.0, time.time() - start_proc)
 
-        # Update global stats
-        with stats_lock:
-            total_events += events
-            total_processing_time += proc_time
-
         thr = (events / proc_time) if proc_time > 0 else 0.0
         logger.info(f"Completed {key}: {events} events in {proc_time:.2f}s ({thr:.2f} ev/s)")
 
-        return out_path, events, proc_time, thread_name
+        return out_path, events, proc_time, local_min, local_max, thread_name
 
     except Exception as e:
         logger.error(f"Failed processing {obj_summary.key}: {e}")
@@ -205,6 +188,12 @@ def main():
     t0 = time.time()
     outputs = []
 
+    # Stats reduced from each worker's result (no shared state, no lock)
+    total_events = 0
+    total_processing_time = 0.0
+    earliest_time = None
+    latest_time = None
+
     try:
         # Use context manager with timeout
         with ThreadPoolExecutor(max_workers=actual_workers,
@@ -216,9 +205,15 @@ def main():
             for fut in as_completed(futures, timeout=DOWNLOAD_TIMEOUT * len(objs)):
                 key = futures[fut]
                 try:
-                    out_path, events, proc_time, thread_name = fut.result(timeout=30)
+                    out_path, events, proc_time, local_min, local_max, thread_name = fut.result(timeout=30)
                     logger.info(f"Thread {thread_name} completed {key}: {events} events")
                     outputs.append(out_path)
+                    total_events += events
+                    total_processing_time += proc_time
+                    if local_min is not None and (earliest_time is None or local_min < earliest_time):
+                        earliest_time = local_min
+                    if local_max is not None and (latest_time is None or local_max > latest_time):
+                        latest_time = local_max
 
                 except TimeoutError:
                     logger.error(f"Timeout processing {key}")
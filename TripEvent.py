@@ -54,4 +54,21 @@ class TripEvent(Event):
         return self.trip_id < other.trip_id
     
     def __hash__(self):
-        return hash(self.payload)
\ No newline at end of file
+        return hash(self.payload)
+
+
+try:
+    import msgspec  # optional: decodes only the dropoff time, no dict per record
+
+    class _TripTime(msgspec.Struct):
+        dropoff_datetime: str
+
+    _decode_trip_time = msgspec.json.Decoder(_TripTime).decode
+
+    def event_timestamp(raw: bytes) -> float:
+        """Event time in ms since epoch, same value as TripEvent.timestamp"""
+        dropoff = _decode_trip_time(raw).dropoff_datetime
+        return datetime.fromisoformat(dropoff.rstrip("Z")).timestamp() * 1000
+except ImportError:
+    def event_timestamp(raw: bytes) -> float:
+        return TripEvent(raw.decode("utf-8")).timestamp
\ No newline at end of file
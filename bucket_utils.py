@@ -0,0 +1,105 @@
+# NYC Taxi Data Pipeline: shared S3 helpers for the decompress-and-upload scripts
+# Purpose: Upload in-memory bytes to S3 without BytesIO / upload_fileobj re-buffering
+
+import io
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+MULTIPART_THRESHOLD = 8 * 1024 * 1024   # Bodies above this go up as multipart
+PART_SIZE = 16 * 1024 * 1024            # Multipart part size (S3 minimum is 5 MiB)
+PART_CONCURRENCY = 16                   # Parts uploaded concurrently per object
+
+# Client config shared by every S3 client in the pipeline scripts: a connection pool large
+# enough for the worker threads (default is 10), adaptive retries that throttle on
+# SlowDown/503 (per-prefix request limits), and TCP keepalive for long transfers.
+# Clients with more requests in flight (workers x PART_CONCURRENCY) merge in a larger pool.
+S3_CONFIG = Config(
+    retries={"mode": "adaptive", "max_attempts": 10},
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    s3={"addressing_style": "virtual"},
+)
+
+# Same multipart settings for files uploaded straight from disk (upload_file)
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=PART_SIZE,
+    max_concurrency=PART_CONCURRENCY,
+    use_threads=True,
+)
+
+
+class _ViewReader(io.RawIOBase):
+    """Seekable read-only file object over a memoryview: lets botocore read a part without copying it"""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, b):
+        chunk = self._view[self._pos:self._pos + len(b)]
+        n = len(chunk)
+        b[:n] = chunk
+        self._pos += n
+        return n
+
+
+def upload_bytes(s3, bucket: str, key: str, data: bytes) -> None:
+    """Upload bytes already in memory: one put_object when small, concurrent multipart otherwise"""
+    if len(data) <= MULTIPART_THRESHOLD:
+        s3.put_object(Bucket=bucket, Key=key, Body=data)
+        return
+
+    view = memoryview(data)
+    offsets = range(0, len(view), PART_SIZE)
+    upload_id = s3.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+
+    def upload_part(part_number: int, start: int) -> dict:
+        resp = s3.upload_part(
+            Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=part_number,
+            Body=_ViewReader(view[start:start + PART_SIZE]),
+        )
+        return {"PartNumber": part_number, "ETag": resp["ETag"]}
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(PART_CONCURRENCY, len(offsets))) as pool:
+            parts = list(pool.map(upload_part, range(1, len(offsets) + 1), offsets))
+        s3.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+    except Exception:
+        # Don't leave orphaned parts (billed storage) behind
+        s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
+
+def bucket_region(response: dict):
+    """Bucket region from a head_bucket response (or ClientError.response); S3 sends it as a header"""
+    return response.get("ResponseMetadata", {}).get("HTTPHeaders", {}).get("x-amz-bucket-region")
+
+
+@lru_cache(maxsize=None)
+def mac_bucket(base: str = "nyc-taxi") -> str:
+    """Unique bucket name {mac-address}-{base}; the MAC prefix avoids naming conflicts (getnode runs once)"""
+    return f"{uuid.getnode():012x}-{base}".lower()
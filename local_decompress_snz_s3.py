@@ -2,37 +2,37 @@
 # Purpose: Takes compressed .snz files, decompresses them, and stores in AWS S3
 
 import os
-import uuid
-import snappy
+import cramjam
 import boto3
-from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.config import Config
 from botocore.exceptions import ClientError
-
-def get_mac_prefix() -> str:
-    """Generate unique bucket prefix using MAC address to avoid naming conflicts"""
-    return f"{uuid.getnode():012x}"
+from bucket_utils import PART_CONCURRENCY, S3_CONFIG, TRANSFER_CONFIG, bucket_region, mac_bucket, upload_bytes
 
 # Configuration: Where to find files and where to store them
 LOCAL_DIR = "./"                    # Look for .snz files in current directory
 BASE_BUCKET = "nyc-taxi"           # Base name for S3 bucket
 PREFIX = "decompressed"            # Folder name inside S3 bucket
+COMPRESSED_PREFIX = "compressed"   # Folder for passthrough .snz uploads
 PREFERRED_REGION = "us-east-2"     # AWS region for cost/performance optimization
+MAX_WORKERS = 8                    # Files decompressed/uploaded concurrently
+DECOMPRESS_ON_INGEST = True        # False: upload the .snz as-is and let downstream readers decompress
 
-# AWS S3 client setup
+# AWS S3 client setup (shared retry config from bucket_utils); the pool holds a connection
+# for every part in flight: MAX_WORKERS files, each uploading PART_CONCURRENCY parts at once
 session = boto3.session.Session(region_name=PREFERRED_REGION)
-s3 = session.client("s3")
+s3 = session.client("s3", config=S3_CONFIG.merge(Config(max_pool_connections=MAX_WORKERS * PART_CONCURRENCY)))
 effective_region = s3.meta.region_name
 
 # Create unique bucket name: {mac-address}-nyc-taxi
-BUCKET = f"{get_mac_prefix()}-{BASE_BUCKET}".lower()
+BUCKET = mac_bucket(BASE_BUCKET)
 
 def bucket_exists_and_region(bucket: str):
     """Check if S3 bucket exists and return its region"""
     try:
-        # Try to access the bucket
-        s3.head_bucket(Bucket=bucket)
-        loc = s3.get_bucket_location(Bucket=bucket).get("LocationConstraint")
-        return True, (loc or "us-east-1")  # us-east-1 returns None for location
+        # Try to access the bucket; the response carries its region, so no get_bucket_location call
+        resp = s3.head_bucket(Bucket=bucket)
+        return True, bucket_region(resp)
     except ClientError as e:
         error_code = e.response.get("Error", {}).get("Code", "")
         
@@ -40,32 +40,25 @@ def bucket_exists_and_region(bucket: str):
         if error_code in ("404", "NoSuchBucket", "NotFound"):
             return False, None
             
-        # Bucket exists but in wrong region
-        if error_code in ("301", "PermanentRedirect"):
-            try:
-                loc = s3.get_bucket_location(Bucket=bucket).get("LocationConstraint")
-                return True, (loc or "us-east-1")
-            except ClientError:
-                return True, None
-                
-        # Bucket exists but no permission to access
-        if error_code in ("403",):
-            return True, None
+        # Bucket exists but in wrong region, or exists but no permission to access:
+        # S3 still reports the bucket's region header on these errors
+        if error_code in ("301", "PermanentRedirect", "403"):
+            return True, bucket_region(e.response)
             
         raise  # Some other unexpected error
 
 def ensure_bucket(bucket: str, client_region: str):
     """Create S3 bucket if it doesn't exist, or verify region if it does"""
-    exists, bucket_region = bucket_exists_and_region(bucket)
+    exists, region = bucket_exists_and_region(bucket)
     
     if exists:
         # Bucket exists - check if regions match
-        if bucket_region and bucket_region != client_region:
+        if region and region != client_region:
             raise RuntimeError(
-                f"Bucket '{bucket}' exists in region '{bucket_region}', "
+                f"Bucket '{bucket}' exists in region '{region}', "
                 f"but your client is using '{client_region}'. Use another name or region."
             )
-        print(f"[INFO] Bucket {bucket} already exists (region: {bucket_region or client_region})")
+        print(f"[INFO] Bucket {bucket} already exists (region: {region or client_region})")
         return
 
     # Create new bucket with proper region configuration
@@ -84,28 +77,42 @@ def ensure_bucket(bucket: str, client_region: str):
 print(f"[DEBUG] Effective client region: {effective_region}")
 ensure_bucket(BUCKET, effective_region)
 
-# Main processing loop: Find, decompress, and upload each .snz file
-for filename in os.listdir(LOCAL_DIR):
-    # Skip files that aren't compressed with snappy
-    if not filename.endswith(".snz"):
-        continue
-
-    # Prepare file paths and S3 key
-    in_path = os.path.join(LOCAL_DIR, filename)
+def process_file(in_path: str, filename: str) -> str:
+    """Decompress one local .snz file in memory and upload it to S3"""
+    # Prepare S3 key
     s3_key = f"{PREFIX}/{filename[:-4]}" if PREFIX else filename[:-4]  # Remove .snz extension
 
+    if not DECOMPRESS_ON_INGEST:
+        # Passthrough: upload the compressed file straight from disk (less egress, no decompress CPU)
+        compressed_key = f"{COMPRESSED_PREFIX}/{filename}" if COMPRESSED_PREFIX else filename
+        s3.upload_file(in_path, BUCKET, compressed_key, Config=TRANSFER_CONFIG)
+        return f"[INFO] Uploaded to s3://{BUCKET}/{compressed_key} (compressed)"
+
     # Process file: decompress in memory and upload to S3
     with open(in_path, "rb") as compressed_file:
-        # Create in-memory buffer for decompressed data
-        decompressed_buffer = BytesIO()
-        
-        # Decompress snappy stream directly to buffer
-        snappy.stream_decompress(src=compressed_file, dst=decompressed_buffer)
-        
-        # Reset buffer position for reading
-        decompressed_buffer.seek(0)
-        
-        # Upload decompressed data to S3
-        s3.upload_fileobj(decompressed_buffer, BUCKET, s3_key)
+        # Decompress all frames in one Rust call that releases the GIL, so workers use separate cores
+        decompressed = cramjam.snappy.decompress(compressed_file.read())
+
+    # Upload decompressed bytes to S3: small files in a single request,
+    # large ones as concurrent multipart parts sliced straight from the bytes
+    upload_bytes(s3, BUCKET, s3_key, decompressed)
+
+    return f"[INFO] Uploaded to s3://{BUCKET}/{s3_key}"
 
-    print(f"[INFO] Uploaded to s3://{BUCKET}/{s3_key}")
\ No newline at end of file
+# Main processing: Find all .snz files (skip files that aren't compressed with snappy).
+# scandir entries carry the full path and a cached file type, so no join or extra stat per file.
+with os.scandir(LOCAL_DIR) as it:
+    snz_files = [(entry.path, entry.name) for entry in it
+                 if entry.name.endswith(".snz") and entry.is_file(follow_symlinks=False)]
+
+# Overlap disk reads, decompression (releases the GIL) and uploads across files;
+# the S3 client is thread-safe and shared by all workers
+if snz_files:
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(snz_files))) as executor:
+        futures = {executor.submit(process_file, path, name): name for path, name in snz_files}
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                print(future.result())
+            except Exception as e:
+                print(f"[ERROR] Failed processing {filename}: {e}")
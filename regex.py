@@ -1,4 +1,16 @@
-import re
+try:
+    import re2 as re  # optional: linear-time DFA matching (google-re2), same API for what is used here
+except ImportError:
+    import re
+
+# All patterns in one alternation, compiled once: a single finditer pass classifies
+# every match by its group name instead of scanning the text once per pattern
+COMBINED_RE = re.compile(
+    r"(?P<email>[a-zA-Z0-9._%+-]+@(?P<domain>[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}))"
+    r"|(?P<date>\d{4}-\d{2}-\d{2})"
+    r"|(?P<phone>\+\d{1,2}-\d{3}-\d{3}-\d{4})"
+    r"|(?P<cap>\b[A-Z][a-zA-Z]+\b)"
+)
 
 def regex_demo():
     text = """
@@ -9,28 +21,39 @@ def regex_demo():
     Today is 2025-09-26.
     """
 
+    # One scan: bucket every match by kind, collect email domains, and
+    # rebuild the text with emails hidden from the email spans
+    found = {"email": [], "date": [], "phone": [], "cap": []}
+    domains = []
+    hidden_parts = []
+    last = 0
+    for m in COMBINED_RE.finditer(text):
+        kind = m.lastgroup
+        found[kind].append(m.group())
+        if kind == "email":
+            domains.append(m.group("domain"))
+            hidden_parts.append(text[last:m.start()])
+            hidden_parts.append("[EMAIL HIDDEN]")
+            last = m.end()
+    hidden_parts.append(text[last:])
+    hidden_text = "".join(hidden_parts)
+
     # 1. Match all email addresses
-    emails = re.findall(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", text)
-    print("📧 Emails found:", emails)
+    print("📧 Emails found:", found["email"])
 
     # 2. Match all dates in YYYY-MM-DD format
-    dates = re.findall(r"\d{4}-\d{2}-\d{2}", text)
-    print("📅 Dates found:", dates)
+    print("📅 Dates found:", found["date"])
 
     # 3. Match all phone numbers like +1-202-555-0173
-    phones = re.findall(r"\+\d{1,2}-\d{3}-\d{3}-\d{4}", text)
-    print("📞 Phone numbers found:", phones)
+    print("📞 Phone numbers found:", found["phone"])
 
     # 4. Find all words starting with a capital letter
-    capital_words = re.findall(r"\b[A-Z][a-zA-Z]+\b", text)
-    print("🔠 Capitalized words:", capital_words)
+    print("🔠 Capitalized words:", found["cap"])
 
     # 5. Match domain names from emails
-    domains = re.findall(r"@([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})", text)
     print("🌐 Domains:", domains)
 
     # 6. Replace all email addresses with [EMAIL HIDDEN]
-    hidden_text = re.sub(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", "[EMAIL HIDDEN]", text)
     print("\n🔒 Text with hidden emails:\n", hidden_text)
 
 if __name__ == "__main__":
@@ -1,41 +1,56 @@
 # NYC Taxi Data Pipeline: Download from AWS public dataset, decompress, and upload to personal S3
 # Purpose: Fetches compressed .snz files from AWS public bucket, decompresses them, stores in your S3
 
-import uuid
-import snappy
+import os
+import queue
+import threading
+import cramjam
 import boto3
-import io
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from bucket_utils import PART_CONCURRENCY, S3_CONFIG, bucket_region, mac_bucket, upload_bytes
 
 # Source configuration: AWS public NYC taxi dataset
 SRC_REGION = "us-east-1"                                               # AWS public data region
 SRC_BUCKET = "aws-bigdata-blog"                                       # AWS public bucket
 SRC_PREFIX = "artifacts/flink-refarch/data/nyc-tlc-trips.snz/"       # Path to compressed files
 
-# Source S3 client for downloading from public dataset
-src_s3 = boto3.client("s3", region_name=SRC_REGION)
-
 # Destination configuration: Your personal S3 storage
 DST_REGION = "us-east-2"                                              # Your preferred region
-session_dst = boto3.session.Session(region_name=DST_REGION)
-dst_s3 = session_dst.client("s3")
-effective_region = dst_s3.meta.region_name
-
-def get_mac_prefix() -> str:
-    """Generate unique bucket prefix using MAC address to avoid naming conflicts"""
-    return f"{uuid.getnode():012x}"
 
 # Create unique destination bucket name and folder structure
-DST_BUCKET = f"{get_mac_prefix()}-nyc-taxi".lower()                   # Your unique bucket
+DST_BUCKET = mac_bucket("nyc-taxi")                                   # Your unique bucket
 DST_PREFIX = "decompressed"                                           # Folder for processed files
+COMPRESSED_PREFIX = "compressed"                                      # Folder for passthrough .snz copies
+DOWNLOAD_WORKERS = 8                                                  # Concurrent source downloads
+DECOMPRESS_WORKERS = os.cpu_count() or 4                              # Decompress threads (one per core)
+UPLOAD_WORKERS = 8                                                    # Concurrent upload workers
+QUEUE_SIZE = 4                                                        # Files waiting between stages (bounds memory)
+KEY_QUEUE_SIZE = 1000                                                 # Listed keys waiting for download
+DECOMPRESS_ON_INGEST = True                                           # False: server-side copy the .snz as-is
+
+# One session (credentials and service model are resolved once) shared by both clients,
+# both using the shared retry config from bucket_utils
+session = boto3.session.Session()
+
+# Source S3 client for downloading from public dataset
+src_s3 = session.client("s3", region_name=SRC_REGION, config=S3_CONFIG)
+
+# Destination S3 client for your bucket; every upload worker may have PART_CONCURRENCY parts in flight
+dst_s3 = session.client(
+    "s3",
+    region_name=DST_REGION,
+    config=S3_CONFIG.merge(Config(max_pool_connections=UPLOAD_WORKERS * PART_CONCURRENCY)),
+)
+effective_region = dst_s3.meta.region_name
 
 def bucket_exists_and_region(bucket: str):
     """Check if destination S3 bucket exists and return its region"""
     try:
-        # Try to access the bucket
-        dst_s3.head_bucket(Bucket=bucket)
-        loc = dst_s3.get_bucket_location(Bucket=bucket).get("LocationConstraint")
-        return True, (loc or "us-east-1")  # us-east-1 returns None for location
+        # Try to access the bucket; the response carries its region, so no get_bucket_location call
+        resp = dst_s3.head_bucket(Bucket=bucket)
+        return True, bucket_region(resp)
     except ClientError as e:
         error_code = e.response.get("Error", {}).get("Code", "")
         
@@ -43,32 +58,25 @@ def bucket_exists_and_region(bucket: str):
         if error_code in ("404", "NoSuchBucket", "NotFound"):
             return False, None
             
-        # Bucket exists but in wrong region
-        if error_code in ("301", "PermanentRedirect"):
-            try:
-                loc = dst_s3.get_bucket_location(Bucket=bucket).get("LocationConstraint")
-                return True, (loc or "us-east-1")
-            except ClientError:
-                return True, None
-                
-        # Bucket exists but no permission to access
-        if error_code in ("403",):
-            return True, None
+        # Bucket exists but in wrong region, or exists but no permission to access:
+        # S3 still reports the bucket's region header on these errors
+        if error_code in ("301", "PermanentRedirect", "403"):
+            return True, bucket_region(e.response)
             
         raise  # Some other unexpected error
 
 def ensure_bucket(bucket: str, client_region: str):
     """Create destination S3 bucket if it doesn't exist, or verify region if it does"""
-    exists, bucket_region = bucket_exists_and_region(bucket)
+    exists, region = bucket_exists_and_region(bucket)
     
     if exists:
         # Bucket exists - check if regions match
-        if bucket_region and bucket_region != client_region:
+        if region and region != client_region:
             raise RuntimeError(
-                f"Bucket '{bucket}' exists in '{bucket_region}', "
+                f"Bucket '{bucket}' exists in '{region}', "
                 f"but client region is '{client_region}'."
             )
-        print(f"[INFO] Bucket {bucket} already exists (region: {bucket_region or client_region})")
+        print(f"[INFO] Bucket {bucket} already exists (region: {region or client_region})")
         return
         
     # Create new bucket with proper region configuration
@@ -87,38 +95,128 @@ def ensure_bucket(bucket: str, client_region: str):
 print(f"[DEBUG] Destination client region: {effective_region}")
 ensure_bucket(DST_BUCKET, effective_region)
 
-# Main processing: Discover and process all .snz files from public dataset
-paginator = src_s3.get_paginator("list_objects_v2")
-pages = paginator.paginate(Bucket=SRC_BUCKET, Prefix=SRC_PREFIX)
+_DONE = object()  # sentinel: no more downloads coming
 
-for page in pages:
-    for item in page.get("Contents", []):
-        key = item["Key"]
-        
-        # Skip folder placeholders and non-compressed files
-        if key.endswith("/") or not key.endswith(".snz"):
-            continue
+def dst_key_for(key: str) -> str:
+    """Destination S3 key for the decompressed contents of a source key"""
+    filename = key.rsplit("/", 1)[-1]  # Extract filename from full path
+    processed_filename = filename[:-4] + ".txt"  # Change extension to .txt (keys are filtered to *.snz)
+    return f"{DST_PREFIX}/{processed_filename}" if DST_PREFIX else processed_filename
 
+def copy_key(key: str):
+    """Passthrough: server-side copy of the compressed object; no bytes go through this client"""
+    filename = key.rsplit("/", 1)[-1]  # Still compressed: keep the .snz name
+    dst_key = f"{COMPRESSED_PREFIX}/{filename}" if COMPRESSED_PREFIX else filename
+    try:
+        dst_s3.copy_object(CopySource={"Bucket": SRC_BUCKET, "Key": key}, Bucket=DST_BUCKET, Key=dst_key)
+    except Exception as e:
+        print(f"[ERROR] Failed copying {key}: {e}")
+        return
+    print(f"[INFO] {key} -> s3://{DST_BUCKET}/{dst_key} (compressed)")
+
+def download_key(key: str, downloaded: queue.Queue):
+    """Pipeline stage 1: download one compressed object and hand it to the decompress stage"""
+    try:
         # Download compressed file from public S3 bucket
         response = src_s3.get_object(Bucket=SRC_BUCKET, Key=key)
-        compressed_stream = response["Body"]  # File-like streaming object
+        compressed = response["Body"].read()
         file_size = response.get("ContentLength", 0)
+    except Exception as e:
+        print(f"[ERROR] Failed downloading {key}: {e}")
+        return
+    downloaded.put((key, compressed, file_size))  # blocks while the decompress stage is behind
 
-        # Prepare destination filename and S3 key
-        filename = key.rsplit("/", 1)[-1]  # Extract filename from full path
-        processed_filename = filename.replace(".snz", ".txt")  # Change extension to .txt
-        dst_key = f"{DST_PREFIX}/{filename}" if DST_PREFIX else filename
+def decompress_worker(downloaded: queue.Queue, decompressed: queue.Queue):
+    """Pipeline stage 2: decompress downloaded objects until the sentinel arrives.
 
-        # Stream processing: Download -> Decompress -> Upload (all in memory)
-        decompressed_buffer = io.BytesIO()
-        
-        # Decompress directly from S3 stream to memory buffer
-        snappy.stream_decompress(src=compressed_stream, dst=decompressed_buffer)
-        
-        # Reset buffer position for uploading
-        decompressed_buffer.seek(0)
-        
-        # Upload decompressed data to your S3 bucket
-        dst_s3.upload_fileobj(decompressed_buffer, DST_BUCKET, dst_key)
+    cramjam decodes the whole framed stream in Rust with the GIL released, so these
+    threads decompress on separate cores in parallel.
+    """
+    while True:
+        item = downloaded.get()
+        if item is _DONE:
+            return
+        key, compressed, file_size = item
+        try:
+            data = cramjam.snappy.decompress(compressed)
+        except Exception as e:
+            print(f"[ERROR] Failed decompressing {key}: {e}")
+            continue
+        decompressed.put((key, data, file_size))  # blocks while the upload stage is behind
+
+def upload_worker(decompressed: queue.Queue):
+    """Pipeline stage 3: upload decompressed objects until the sentinel arrives"""
+    while True:
+        item = decompressed.get()
+        if item is _DONE:
+            return
+        key, data, file_size = item
+
+        # Prepare destination S3 key
+        dst_key = dst_key_for(key)
+
+        try:
+            # Upload decompressed bytes to your S3 bucket: small files in a single request,
+            # large ones as concurrent multipart parts sliced straight from the buffer
+            upload_bytes(dst_s3, DST_BUCKET, dst_key, data)
+        except Exception as e:
+            print(f"[ERROR] Failed processing {key}: {e}")
+            continue
+
+        print(f"[INFO] {key} ({file_size} bytes) -> s3://{DST_BUCKET}/{dst_key}")
+
+def list_keys(keys: queue.Queue, consumers: int):
+    """Pipeline stage 0: page through the source prefix, queueing .snz keys as each page arrives"""
+    try:
+        paginator = src_s3.get_paginator("list_objects_v2")
+        pages = paginator.paginate(Bucket=SRC_BUCKET, Prefix=SRC_PREFIX)
+
+        for page in pages:
+            for item in page.get("Contents", []):
+                key = item["Key"]
+
+                # Skip folder placeholders and non-compressed files
+                if key.endswith("/") or not key.endswith(".snz"):
+                    continue
+                keys.put(key)
+    except Exception as e:
+        print(f"[ERROR] Failed listing s3://{SRC_BUCKET}/{SRC_PREFIX}: {e}")
+    finally:
+        for _ in range(consumers):
+            keys.put(_DONE)
+
+def download_worker(keys: queue.Queue, downloaded: queue.Queue):
+    """Pull keys from the listing until the sentinel arrives, downloading each"""
+    while True:
+        key = keys.get()
+        if key is _DONE:
+            return
+        if DECOMPRESS_ON_INGEST:
+            download_key(key, downloaded)
+        else:
+            copy_key(key)
 
-        print(f"[INFO] {key} ({file_size} bytes) -> s3://{DST_BUCKET}/{dst_key}")
\ No newline at end of file
+# Main processing: pipeline over all .snz files from public dataset.
+# Listing runs in its own thread so ListObjectsV2 page latency overlaps the transfers;
+# downloads, decompression (one thread per core) and uploads of different files overlap,
+# and the bounded queues keep each stage from running ahead of the next.
+# boto3 clients are thread-safe and shared by all workers.
+key_queue = queue.Queue(maxsize=KEY_QUEUE_SIZE)
+downloaded = queue.Queue(maxsize=QUEUE_SIZE)
+decompressed = queue.Queue(maxsize=QUEUE_SIZE)
+lister = threading.Thread(target=list_keys, args=(key_queue, DOWNLOAD_WORKERS), daemon=True)
+lister.start()
+with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as uploaders:
+    for _ in range(UPLOAD_WORKERS):
+        uploaders.submit(upload_worker, decompressed)
+    with ThreadPoolExecutor(max_workers=DECOMPRESS_WORKERS) as decompressors:
+        for _ in range(DECOMPRESS_WORKERS):
+            decompressors.submit(decompress_worker, downloaded, decompressed)
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as downloaders:
+            for _ in range(DOWNLOAD_WORKERS):
+                downloaders.submit(download_worker, key_queue, downloaded)
+        for _ in range(DECOMPRESS_WORKERS):
+            downloaded.put(_DONE)
+    for _ in range(UPLOAD_WORKERS):
+        decompressed.put(_DONE)
+lister.join()
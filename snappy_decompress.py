@@ -10,7 +10,12 @@ $DESCRIPTION$
 """
 
 import os
-import snappy
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import cramjam
 
 # with open(local_snz_path, "rb") as src, open(out_path, "wb") as dst:
         # snappy.stream_decompress(src=src, dst=dst)
@@ -18,27 +23,70 @@ import snappy
 local_snz_path = "./"
 dst_dir = "./snappy_decompress/"
 
-if not os.path.exists(dst_dir):
-    os.makedirs(dst_dir)
-for filename in os.listdir(local_snz_path):
-    if filename.endswith(".snz"):
+DECOMPRESS_WORKERS = os.cpu_count() or 4  # cramjam releases the GIL, so these use separate cores
+_DONE = object()  # sentinel: reader has queued every file
+
+
+def read_files(pending: queue.Queue):
+    """Stage 1: read each .snz file whole and queue it; disk reads overlap decompression"""
+    try:
+        with os.scandir(local_snz_path) as it:
+            for entry in it:
+                if entry.name.endswith(".snz") and entry.is_file(follow_symlinks=False):
+                    with open(entry.path, "rb", buffering=1 << 20) as src:
+                        pending.put((entry.name, src.read()))  # blocks while decompressors are behind
+    finally:
+        for _ in range(DECOMPRESS_WORKERS):
+            pending.put(_DONE)
+
+
+def decompress_files(pending: queue.Queue):
+    """Stage 2: decompress queued files and write them out until the sentinel arrives"""
+    while True:
+        item = pending.get()
+        if item is _DONE:
+            return
+        filename, compressed = item
         out_path = os.path.join(dst_dir, filename[:-4])  # Remove .snz extension
-        with open(os.path.join(local_snz_path, filename), "rb") as src, open(out_path, "wb") as dst:
-            snappy.stream_decompress(src=src, dst=dst)
+        try:
+            # Decompress every frame in one Rust call, then write the buffer with raw os.write
+            # calls (no file-object buffering); os.write may write less than asked, so loop
+            view = memoryview(cramjam.snappy.decompress(compressed))
+            fd = os.open(out_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+            try:
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+        except Exception as e:
+            print(f"Failed to decompress {filename}: {e}")
+            continue
         print(f"Decompressed {filename} to {out_path}")
 
+
+if not os.path.exists(dst_dir):
+    os.makedirs(dst_dir)
+
+pending = queue.Queue(maxsize=4)
+reader = threading.Thread(target=read_files, args=(pending,), daemon=True)
+reader.start()
+with ThreadPoolExecutor(max_workers=DECOMPRESS_WORKERS) as pool:
+    for fut in [pool.submit(decompress_files, pending) for _ in range(DECOMPRESS_WORKERS)]:
+        fut.result()
+reader.join()
+
 # I want to open notepad using os module and capture the PID
 pid = os.system("notepad.exe")
 print(f"Notepad opened with PID: {pid}")
 
 # Want to read each decompressed file and print the first 100 lines
-for filename in os.listdir(dst_dir):
-    if not filename.endswith(".snz"):
-        out_path = os.path.join(dst_dir, filename)
-        print(f"Reading {out_path}:")
-        with open(out_path, "r") as file:
-            for i, line in enumerate(file):
-                if i >= 100:
-                    break
-                print(line.strip())
-        print("\n" + "="*40 + "\n")  # Separator between files
+with os.scandir(dst_dir) as it:
+    for entry in it:
+        if not entry.name.endswith(".snz") and entry.is_file(follow_symlinks=False):
+            out_path = entry.path
+            print(f"Reading {out_path}:")
+            # islice stops after 100 lines without a per-line check; undecodable bytes are replaced
+            with open(out_path, "r", encoding="utf-8", errors="replace", buffering=1 << 20) as file:
+                for line in islice(file, 100):
+                    print(line.strip())
+            print("\n" + "="*40 + "\n")  # Separator between files
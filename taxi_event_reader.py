@@ -11,31 +11,67 @@ $DESCRIPTION$
 
 import boto3
 from boto3 import session
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 import FileFormatDetection
+from bucket_utils import S3_CONFIG
 
 region = "us-east-1"
 bucket_name = "aws-bigdata-blog"
 object_prefix = "artifacts/flink-refarch/data/nyc-tlc-trips.snz/"
 
+# Multipart transfer settings: objects above the threshold download as 16 MiB ranges,
+# 8 at a time per file (files themselves also download concurrently, see MAX_WORKERS)
+transfer_config = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True,
+)
+
+MAX_WORKERS = 16  # files downloaded concurrently
+
+# One session and one client for listing and every download; clients are thread-safe
+# (resources are not). Shared retry/keepalive config, pool sized for MAX_WORKERS files x ranges.
 session_ = session.Session()
-s3_resource = session_.resource('s3', region_name=region)
+s3_client = session_.client(
+    's3',
+    region_name=region,
+    config=S3_CONFIG.merge(Config(max_pool_connections=MAX_WORKERS * transfer_config.max_concurrency)),
+)
 
-bucket = s3_resource.Bucket(bucket_name)
 print("Files in S3 bucket:")
 # for obj in bucket.objects.filter(Prefix=object_prefix):
 #     # get_obj = s3_resource.Object(bucket_name, obj.key)
 #     print(obj.key)
 
-for obj in bucket.objects.filter(Prefix=object_prefix):
-    target = obj.key.split("/")[-1]
-    if target:  # avoid downloading empty prefix
-        print(f"Downloading {obj.key} to {target}")
-        bucket.download_file(obj.key, "./"+target)
-        print(f"Downloaded {obj.key} to {target}")
-        res = FileFormatDetection.sniff_format("./"+target)
-        print(f'File Format detection summary for {target} is {res.summary()}')
-        print(f'File Format detection isColumar for {target} is {res.is_columnar()}')
-        print(f'File Format detection isCompressed for {target} is {res.is_compressed()}')
-        print(f'File Format detection metadata for {target} is {res.metadata()}')
-        print(target)
-        print(f"Size: {obj.size/(1024*1024):.2f} MB")
\ No newline at end of file
+
+def download_one(key, size):
+    target = key.split("/")[-1]
+    print(f"Downloading {key} to {target}")
+    s3_client.download_file(bucket_name, key, "./"+target, Config=transfer_config)
+    print(f"Downloaded {key} to {target}")
+    res = FileFormatDetection.sniff_format("./"+target)
+    print(f'File Format detection summary for {target} is {res.summary()}')
+    print(f'File Format detection isColumar for {target} is {res.is_columnar()}')
+    print(f'File Format detection isCompressed for {target} is {res.is_compressed()}')
+    print(f'File Format detection metadata for {target} is {res.metadata()}')
+    print(target)
+    print(f"Size: {size/(1024*1024):.2f} MB")
+
+
+# List first, then download files in parallel (each also split into concurrent ranges)
+paginator = s3_client.get_paginator("list_objects_v2")
+objects = [(obj["Key"], obj["Size"])
+           for page in paginator.paginate(Bucket=bucket_name, Prefix=object_prefix)
+           for obj in page.get("Contents", [])
+           if obj["Key"].split("/")[-1]]  # avoid downloading empty prefix
+
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+    futures = {pool.submit(download_one, key, size): key for key, size in objects}
+    for fut in as_completed(futures):
+        try:
+            fut.result()
+        except Exception as e:
+            print(f"Failed downloading {futures[fut]}: {e}")
@@ -3,14 +3,14 @@ NYC Taxi Events Reader - Multi-Threaded Version
 ===============================================
 
 This script downloads NYC taxi trip data from AWS S3, decompresses it using Snappy compression,
-and processes the events to extract timing information. It uses multi-threading to process
-multiple S3 objects concurrently for improved performance.
+and processes the events to extract timing information. It uses a pool of worker processes
+(one per CPU core) to process multiple S3 objects in parallel for improved performance.
 
 Key Features:
 - Downloads compressed taxi trip data from a public S3 bucket
 - Decompresses Snappy-compressed files in memory
 - Extracts timing information from each trip event
-- Processes multiple files concurrently using threading
+- Processes multiple files in parallel across processes (not limited by the GIL)
 - Outputs decompressed NDJSON files with timing statistics
 
 Author: kavyasripunna2020
@@ -29,17 +29,21 @@ from botocore.exceptions import NoCredentialsError
 # Standard library imports for file operations and concurrency
 import os
 import io
-import threading
+import mmap
+import multiprocessing
 import time
 import re
+from collections import deque
+from itertools import islice
+from datetime import datetime
 
 # Third-party imports for compression and file format detection
-import snappy
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import cramjam
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import FileFormatDetection
+from bucket_utils import S3_CONFIG
 
 # Local application imports
-from TripEvent import TripEvent
 import AdaptTimeOption
 
 # ----------------------
@@ -49,26 +53,33 @@ REGION = "us-east-1"                                              # AWS region w
 BUCKET_NAME = "aws-bigdata-blog"                                  # Public S3 bucket containing NYC taxi data
 OBJECT_PREFIX = "artifacts/flink-refarch/data/nyc-tlc-trips.snz/" # S3 path prefix to taxi trip files
 MAX_FILES = 20                                                    # Maximum number of files to download and process
+MAX_WORKERS = os.cpu_count() or 1                                 # Worker processes: one per core, the parse is CPU-bound
 OUTPUT_DIR = "./snappy_decompressed_events"                      # Local directory for decompressed output files
+RANGE_CHUNK_SIZE = 16 * 1024 * 1024                               # Objects larger than this download as byte ranges of this size
+RANGE_WORKERS = 8                                                 # Concurrent range GETs per object
+STREAM_CHUNK_SIZE = 1024 * 1024                                   # Read size when streaming a small object's body
+SNAPPY_STREAM_IDENTIFIER = b"\xff\x06\x00\x00sNaPpY"              # First chunk of every Snappy framed stream
 
-# ----------------------
-# Global Variables for Thread-Safe Statistics
-# ----------------------
-stats_lock = threading.Lock()    # Thread synchronization lock for shared statistics
-total_events = 0                 # Total number of events processed across all threads
-total_processing_time = 0.0      # Cumulative processing time across all threads
-earliest_time = None             # Earliest timestamp found in any event (milliseconds since epoch)
-latest_time = None               # Latest timestamp found in any event (milliseconds since epoch)
+# Pulls the dropoff time (the event timestamp, see TripEvent) straight out of raw NDJSON
+# bytes, without parsing the records into dicts. Only the dataset's fixed-width ISO-8601
+# layout is captured, so string order is time order; any other value (e.g. "NULL") does
+# not match and the line counts as malformed.
+DROPOFF_RE = re.compile(rb'"dropoff_datetime"\s*:\s*"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z?)"')
 
 # ----------------------
 # AWS S3 Session Setup
 # ----------------------
-session_ = session.Session()                           # Create a new AWS session
-s3_resource = session_.resource('s3', region_name=REGION)  # Initialize S3 resource for the specified region
-
-bucket = s3_resource.Bucket(BUCKET_NAME)               # Get reference to the S3 bucket
 print("Files in S3 bucket:")
 
+# Shared S3 client for the downloads: built once per worker process (at import, or inherited
+# unused from the parent) and reused for every file it processes, so sessions, endpoint data
+# and the HTTP connection pool are not rebuilt per file. Clients are thread-safe; the shared
+# pipeline config sizes the pool for the concurrent range GETs (default is 10) and adds
+# adaptive retries (S3 503 SlowDown) and TCP keepalive. Client-side parameter validation is
+# off: every request is built here with known-good parameters, and range GETs are numerous.
+UNSIGNED_S3_CONFIG = S3_CONFIG.merge(Config(signature_version=UNSIGNED, parameter_validation=False))
+S3 = boto3.client("s3", region_name=REGION, config=UNSIGNED_S3_CONFIG)
+
 # ----------------------
 # Helper Functions
 # ----------------------
@@ -109,169 +120,311 @@ def list_s3_objects(bucket_name: str, prefix: str, max_files: int):
         max_files (int): Maximum number of objects to return
     
     Returns:
-        list: List of S3 ObjectSummary instances up to max_files limit
+        list: List of {"Bucket", "Key", "Size"} dicts up to max_files limit (plain dicts,
+              so they can be pickled to the worker processes)
     """
-    # Create S3 resource with unsigned config for public bucket access
-    s3_res = session.Session().resource("s3", config=Config(signature_version=UNSIGNED))
-    bucket = s3_res.Bucket(bucket_name)
-    
+    # Create an unsigned S3 client for public bucket access. It is separate from the shared
+    # download client, so the parent never opens connections that forked workers would inherit.
+    s3_client = session.Session().client("s3", region_name=REGION, config=UNSIGNED_S3_CONFIG)
+
+    # Low-level ListObjectsV2 paginator: stops after max_files keys (a single request for
+    # max_files <= 1000) and yields plain dicts, no resource-layer ObjectSummary per key
+    paginator = s3_client.get_paginator("list_objects_v2")
+    pages = paginator.paginate(
+        Bucket=bucket_name,
+        Prefix=prefix,
+        PaginationConfig={"MaxItems": max_files, "PageSize": max_files},
+    )
+
     out = []
-    # Iterate through objects matching the prefix
-    for i, obj in enumerate(bucket.objects.filter(Prefix=prefix)):
-        print(f"Found: {obj.key}")
-        out.append(obj)
-        # Stop when we reach the maximum file limit
-        if i + 1 >= max_files:
-            break
+    for page in pages:
+        for obj in page.get("Contents", []):
+            print(f"Found: {obj['Key']}")
+            out.append({"Bucket": bucket_name, "Key": obj["Key"], "Size": obj["Size"]})
+
+    s3_client.close()
     return out
 
-def download_and_decompress(s3_client, obj_summary):
+def iter_compressed_chunks(s3_client, obj):
     """
-    Download an S3 object and decompress it using Snappy compression.
+    Yield the compressed bytes of an S3 object in order, as they arrive.
     
-    This function downloads a Snappy-compressed file from S3, reads it into memory,
-    and decompresses it using the Snappy streaming decompression algorithm.
+    Small objects are streamed from a single GET in STREAM_CHUNK_SIZE pieces; objects
+    larger than RANGE_CHUNK_SIZE are fetched as concurrent byte-range GETs (a single
+    stream is capped per connection) and each range is yielded as soon as it and every
+    range before it have arrived, so the consumer starts while later ranges download
+    (at most RANGE_WORKERS ranges are requested ahead of the consumer).
     
     Args:
         s3_client: Boto3 S3 client instance for making requests
-        obj_summary: S3 ObjectSummary containing bucket name and key
+        obj (dict): {"Bucket", "Key", "Size"} of the object to download
     
-    Returns:
-        tuple: (decompressed_stream, download_time_seconds, original_file_size)
-            - decompressed_stream (BytesIO): In-memory stream of decompressed data
-            - download_time_seconds (float): Time taken to download and decompress
-            - original_file_size (int): Size of the compressed file in bytes
+    Yields:
+        bytes: Consecutive pieces of the compressed object
     """
-    start = time.time()
+    size = obj["Size"]  # Compressed object size, already known from the listing (no HEAD)
+    if size <= RANGE_CHUNK_SIZE:
+        # Small object: a single GET, read incrementally
+        resp = s3_client.get_object(Bucket=obj["Bucket"], Key=obj["Key"])
+        yield from resp["Body"].iter_chunks(STREAM_CHUNK_SIZE)
+        return
+
+    def fetch_range(lo):
+        hi = min(lo + RANGE_CHUNK_SIZE, size) - 1
+        resp = s3_client.get_object(
+            Bucket=obj["Bucket"], Key=obj["Key"], Range=f"bytes={lo}-{hi}"
+        )
+        return resp["Body"].read()
+
+    # Sliding window: at most RANGE_WORKERS ranges are in flight or downloaded-but-unconsumed;
+    # the next range is only submitted as one is handed to the consumer, so a slow consumer
+    # stalls the downloads instead of letting finished parts pile up
+    offsets = iter(range(0, size, RANGE_CHUNK_SIZE))
+    with ThreadPoolExecutor(max_workers=RANGE_WORKERS) as pool:
+        parts = deque(pool.submit(fetch_range, lo) for lo in islice(offsets, RANGE_WORKERS))
+        while parts:
+            # Drop each part's future before handing its bytes over, so a consumed part is
+            # freed right away; with the window above, at most RANGE_WORKERS + 1 compressed
+            # parts (the window plus the one being decompressed) are alive at once
+            part = parts.popleft()
+            lo = next(offsets, None)
+            if lo is not None:
+                parts.append(pool.submit(fetch_range, lo))
+            yield part.result()  # in order; re-raises range errors
+
+def snappy_framed_length(buf):
+    """
+    Find the complete frames at the start of a Snappy framed buffer and their exact
+    decompressed size, from the chunk headers alone.
     
-    # Download the object from S3
-    resp = s3_client.get_object(Bucket=obj_summary.bucket_name, Key=obj_summary.key)
-    payload = resp["Body"].read()  # Read entire file into memory
-    size = resp["ContentLength"]   # Get original compressed file size
+    Every chunk starts with a 1-byte type and a 3-byte little-endian length. Compressed
+    chunks (type 0x00) carry a 4-byte CRC followed by a raw Snappy block, whose varint
+    header is its uncompressed length; uncompressed chunks (type 0x01) are the CRC plus
+    the data itself. Other chunk types (stream identifier, padding) add nothing. A chunk
+    cut off by the end of buf (a range boundary) is left for the next call.
     
-    # Set up source and destination streams for decompression
-    src = io.BytesIO(payload)      # Source: compressed data in memory
-    dst = io.BytesIO()             # Destination: decompressed data
+    Args:
+        buf: The start of a compressed framed stream (bytes-like)
     
-    # Perform Snappy stream decompression
-    snappy.stream_decompress(src=src, dst=dst)
-    dst.seek(0)  # Reset stream position to beginning for reading
+    Returns:
+        tuple: (end, length) - offset just past the last complete chunk in buf, and the
+               total size of the decompressed data of buf[:end] in bytes
+    """
+    total = 0
+    pos = 0
+    with memoryview(buf) as view:
+        while pos + 4 <= len(view):
+            kind = view[pos]
+            length = view[pos + 1] | (view[pos + 2] << 8) | (view[pos + 3] << 16)
+            body = pos + 4
+            if body + length > len(view):
+                break  # Incomplete chunk
+            if kind == 0x00:
+                total += cramjam.snappy.decompress_raw_len(view[body + 4:body + length])
+            elif kind == 0x01:
+                total += length - 4
+            pos = body + length
+    return pos, total
+
+def write_all(fd: int, data) -> None:
+    """Write all of data to a raw file descriptor; os.write may write less than asked, so loop."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+def dropoff_ms(dropoff: bytes) -> float:
+    """Convert a raw dropoff_datetime value to ms since epoch, same as TripEvent.timestamp."""
+    return datetime.fromisoformat(dropoff.decode("ascii").rstrip("Z")).timestamp() * 1000
+
+def scan_events(block, start: int, end: int, key: str):
+    """
+    Count the events in a block of complete NDJSON lines and find their timestamp bounds.
     
-    # Calculate total processing time
-    read_time = max(0.0, time.time() - start)
-    return dst, read_time, size
-
-def process_object(obj_summary):
+    The whole block is scanned with C-level calls only (one regex findall, one newline
+    count, min/max over the matches); no Python code runs per line. DROPOFF_RE only
+    captures the fixed-width ISO-8601 layout ("2016-01-01T05:33:00.000Z"), so comparing
+    the matches as strings orders them in time, and only the two bounds need converting.
+    Lines without a conforming dropoff time are counted as malformed and skipped.
+    
+    Args:
+        block: Decompressed bytes; block[start:end] holds complete lines, each ending in
+               b"\n" (scanned in place, the range is never sliced out)
+        start (int): Offset of the first complete line in block
+        end (int): Offset just past the last complete line in block
+        key (str): S3 key the lines came from (for error messages)
+    
+    Returns:
+        tuple: (events, earliest_dropoff, latest_dropoff) for this block, the bounds as
+               raw dropoff_datetime bytes; None when no line had a timestamp
+    """
+    stamps = DROPOFF_RE.findall(block, start, end)
+    skipped = block.count(b"\n", start, end) - len(stamps)
+    if skipped > 0:
+        print(f"{key}: Ignoring {skipped} malformed line(s).")
+    if not stamps:
+        return 0, None, None
+    return len(stamps), min(stamps), max(stamps)
+
+def rescan_events(path: str, key: str):
     """
-    Process a single S3 object in a dedicated thread.
+    Recount a written NDJSON file converting every distinct dropoff time, dropping the
+    ones that are not real dates.
     
-    This function is the core worker function that handles:
-    1. Downloading and decompressing the S3 object
-    2. Detecting the file format
-    3. Parsing each line as a TripEvent to extract timestamps
-    4. Writing decompressed data to a local NDJSON file
-    5. Updating global statistics in a thread-safe manner
+    DROPOFF_RE checks the layout, not the calendar, so a value such as
+    "2016-02-30T00:00:00.000Z" can win the string min/max and then fail to convert.
+    Only then is the file read back (memory-mapped, not loaded) and its distinct stamps
+    converted one by one, so a single bad record cannot erase the file's time range.
     
     Args:
-        obj_summary: S3 ObjectSummary containing bucket name and key information
+        path (str): The NDJSON file written for the object
+        key (str): S3 key the file came from (for error messages)
     
     Returns:
-        tuple: (output_file_path, events_processed, processing_time, thread_name)
+        tuple: (events, earliest_time, latest_time) with the lines carrying an invalid
+               date not counted; the bounds in ms since epoch, None when no date was valid
     """
-    print(f"Thread Name: {threading.current_thread().name} - Starting processing for {obj_summary.key}")
-
-    # Create S3 client for this thread (each thread needs its own client)
-    sess = session.Session()
-    s3_client = sess.client("s3", region_name=REGION)
-
-    # Access global statistics variables
-    global total_events, total_processing_time, earliest_time, latest_time
-
-    key = obj_summary.key
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as block:
+        stamps = DROPOFF_RE.findall(block)
+    converted = {}
+    for stamp in set(stamps):
+        try:
+            converted[stamp] = dropoff_ms(stamp)
+        except ValueError:
+            pass
+    invalid = len(stamps) - sum(1 for stamp in stamps if stamp in converted)
+    print(f"{key}: Ignoring {invalid} line(s) with an invalid dropoff time.")
+    times = converted.values()
+    return len(stamps) - invalid, min(times, default=None), max(times, default=None)
+
+def process_object(obj):
+    """
+    Process a single S3 object in a worker process.
     
-    # Download and decompress the S3 object
-    stream, read_time, size = download_and_decompress(s3_client, obj_summary)
-    bps = (size / read_time) if read_time > 0 else float("inf")
-    print(f"Started thread {threading.current_thread()} Read {key}: {size} bytes in {read_time:.2f}s ({bps:.2f} B/s)")
+    This function is the core worker function. Download, decompression and parsing
+    are fused into one streaming pass, so network waits overlap the CPU work and the
+    whole compressed / decompressed file is never held in memory:
+    1. Streaming the compressed S3 object and decompressing the complete Snappy frames
+       of each part in one cramjam call, into a buffer sized exactly from their headers
+    2. Detecting the file format from the first decompressed block
+    3. Writing each decompressed block to a local NDJSON file
+    4. Scanning the timestamps of each block's complete lines in bulk (a partial
+       last line is carried over to the next block)
+    5. Returning this file's statistics for the parent process to reduce
+    
+    Args:
+        obj (dict): {"Bucket", "Key", "Size"} of the object to process
+    
+    Returns:
+        tuple: (output_file_path, events_processed, processing_time,
+                earliest_time, latest_time, process_name)
+    """
+    worker = multiprocessing.current_process().name
+    print(f"Process Name: {worker} - Starting processing for {obj['Key']}")
 
-    # Detect the file format of the decompressed stream
-    file_format = FileFormatDetection.sniff_stream(stream)
-    print(f"Started thread {threading.current_thread()}  Detected file format for {key}: {file_format}")
-    stream.seek(0)  # Rewind stream after format detection
+    key = obj["Key"]
+    size = obj["Size"]
 
     # Prepare output directory and file path
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     out_path = os.path.join(OUTPUT_DIR, safe_filename_from_key(key, ".ndjson"))
 
-    # Initialize counters and timing
-    events = 0
+    # Initialize timing and the per-block (events, earliest, latest) results
+    batches = []
     start_proc = time.time()
 
-    # Process each line in the decompressed stream
-    with open(out_path, "w", encoding="utf-8", buffering=1024 * 1024) as fh:
-        for raw in stream:
-            try:
-                # Decode the raw bytes to string
-                line = raw.decode("unicode_escape")
-                
-                # Parse as TripEvent to extract timestamp
-                ev = TripEvent(line)
-                ts_ms = ev.timestamp  # Keep raw milliseconds since epoch
-
-                # Update global timestamp bounds (thread-safe)
-                if ts_ms is not None:
-                    with stats_lock:
-                        if earliest_time is None or ts_ms < earliest_time:
-                            earliest_time = ts_ms
-                        if latest_time is None or ts_ms > latest_time:
-                            latest_time = ts_ms
-
-                # Write the original line to output file
-                if not line.endswith("\n"):
-                    line += "\n"
-                fh.write(line)
-
-                events += 1
-                # Flush output buffer periodically for large files
-                if events % 50000 == 0:
-                    fh.flush()
-                    
-            except ValueError:
-                print(f"{key}: Ignoring malformed line.")
-            except Exception as e:
-                print(f"{key}: Error processing line: {e}")
-        
-        # Ensure all data is written to disk
-        fh.flush()
-        fh.close()
-
-    # Calculate processing time and update global statistics
+    pending = bytearray()  # Stream identifier + compressed bytes not yet decompressed
+    tail = b""             # Incomplete last line of the previous block
+    sniffed = False
+
+    # Raw unbuffered file descriptor: the blocks are already large, so a buffered file object
+    # would only add a copy; the page cache does the buffering
+    fd = os.open(out_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        for chunk in iter_compressed_chunks(S3, obj):
+            pending += chunk
+            del chunk  # Don't keep this compressed part alive while the next one is awaited
+
+            # Decompress every complete frame in one call. The output is allocated once at
+            # its exact size (read from the frame headers) instead of grown, and written into
+            # directly. The decoder needs the stream identifier first, so pending always
+            # starts with it: only the frames after it are dropped once decompressed.
+            end, length = snappy_framed_length(pending)
+            if not length:
+                continue  # Part ended mid-frame; more input needed
+            data = bytearray(length)
+            with memoryview(pending) as view:
+                cramjam.snappy.decompress_into(view[:end], data)
+            del pending[len(SNAPPY_STREAM_IDENTIFIER):end]
+
+            if not sniffed:
+                # Detect the file format from the first decompressed block
+                file_format = FileFormatDetection.sniff_stream(io.BytesIO(data))
+                print(f"Process {worker}  Detected file format for {key}: {file_format}")
+                sniffed = True
+
+            # The source bytes are already NDJSON text: write the decompressed block as-is,
+            # straight from the decompressor's buffer
+            write_all(fd, data)
+
+            # Scan the block in place rather than concatenating it onto the carried tail
+            # (a full copy of every block): only the line straddling the two blocks is
+            # joined, and the partial last line is kept for the next block
+            first = data.find(b"\n") + 1
+            if not first:
+                tail += data  # No line ends in this block
+                continue
+            head = tail + data[:first]
+            batches.append(scan_events(head, 0, len(head), key))
+            end = data.rfind(b"\n") + 1
+            batches.append(scan_events(data, first, end, key))
+            tail = data[end:]
+
+        # A truncated stream leaves its incomplete last frame behind in pending
+        if snappy_framed_length(pending)[0] < len(pending):
+            raise cramjam.DecompressionError(f"{key}: compressed stream ended mid-frame")
+
+        # Last line without a trailing newline
+        if tail:
+            write_all(fd, b"\n")
+            batches.append(scan_events(tail + b"\n", 0, len(tail) + 1, key))
+    finally:
+        os.close(fd)
+
+    # Reduce the blocks to this file's totals (converting only the two bounds);
+    # the parent process merges them across files
+    events = sum(b[0] for b in batches)
+    earliest = min((b[1] for b in batches if b[1] is not None), default=None)
+    latest = max((b[2] for b in batches if b[2] is not None), default=None)
+    try:
+        earliest_time = dropoff_ms(earliest) if earliest is not None else None
+        latest_time = dropoff_ms(latest) if latest is not None else None
+    except ValueError:
+        # A bound has the ISO layout but is not a real date: fall back to the slow path
+        events, earliest_time, latest_time = rescan_events(out_path, key)
+
+    # Calculate processing time (download, decompression and parsing together)
     proc_time = max(0.0, time.time() - start_proc)
-    with stats_lock:
-        total_events += events
-        total_processing_time += proc_time
+    bps = (size / proc_time) if proc_time > 0 else float("inf")
+    print(f"Process {worker} Read {key}: {size} bytes in {proc_time:.2f}s ({bps:.2f} B/s)")
 
     # Calculate and display throughput
     thr = (events / proc_time) if proc_time > 0 else 0.0
-    print(f"Started thread {threading.current_thread()} Wrote {events} events to {out_path} | ProcTime {proc_time:.2f}s | {thr:.2f} ev/s")
-
-    # Clean up S3 client resources
-    s3_client.close()
+    print(f"Process {worker} Wrote {events} events to {out_path} | ProcTime {proc_time:.2f}s | {thr:.2f} ev/s")
 
-    return out_path, events, proc_time, threading.current_thread().name
+    return out_path, events, proc_time, earliest_time, latest_time, worker
 
 def main():
     """
-    Main function that orchestrates the multi-threaded processing of NYC taxi data.
+    Main function that orchestrates the parallel processing of NYC taxi data.
     
     This function:
     1. Lists S3 objects to process based on configuration
-    2. Creates and starts worker threads for parallel processing
-    3. Waits for all threads to complete
+    2. Submits each object to a pool of worker processes (one per CPU core)
+    3. Collects each file's statistics as it completes
     4. Displays comprehensive processing statistics
     
-    The function uses native Python threading rather than ThreadPoolExecutor
-    to provide more control over thread naming and lifecycle management.
+    Parsing and writing the events is CPU-bound Python, so worker processes
+    rather than threads are used: each has its own interpreter and GIL.
     """
     
     # ----------------------
@@ -286,63 +439,50 @@ def main():
     t0 = time.time()
     outputs = []
 
-    # Get reference to main thread for debugging
-    current_thread = threading.current_thread()
-    print(f"Thread Name: {current_thread.name}")
-    
-    # ----------------------
-    # Alternative ThreadPoolExecutor approach (commented out)
-    # ----------------------
-    # This shows an alternative implementation using ThreadPoolExecutor
-    # which would provide automatic thread pool management but less control
-    # over individual thread naming and lifecycle
-    # 
-    # with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
-    #     futures = {pool.submit(process_object, obj): obj.key for obj in objs}
-    #     for fut in as_completed(futures):
-    #         key = futures[fut]
-    #         try:
-    #             out_path, events, proc_time, threadname = fut.result()
-    #             print(f"Thread Name: {threadname} | Completed processing {key}: {events} events in {proc_time:.2f}s")
-    #             outputs.append(out_path)
-    #         except Exception as e:
-    #             print(f"Failed processing {key}: {e}")
-
-    # ----------------------
-    # Phase 2: Thread Creation and Startup
-    # ----------------------
-    i = 0
-    threads = []
-    
-    for obj in objs:
-        i = i + 1
-        
-        # Extract filename from S3 key for thread naming
-        # Uses regex to get the last part of the path (filename with extension)
-        match = re.search(r'([^/]+\.[^/]+)$', obj.key)
-        if not match:
-            continue  # Skip if it's a directory (no file extension)
-        obj_name = match.group(0)  # Get filename with extension
-                
-        # Create and start worker thread with descriptive name
-        thread = threading.Thread(
-            target=process_object, 
-            args=(obj,), 
-            name=f"Thread {obj_name}-{i}"
-        )
-        threads.append(thread)
-        thread.start()
-        print(f"Started thread {thread.name} for {obj.key}")
-
-    # ----------------------
-    # Phase 3: Thread Synchronization - Wait for completion
-    # ----------------------
-    for thread in threads:
-        thread.join()  # Block until this thread completes
-        print(f"Thread {thread.name} has finished execution.")
-        outputs.append(thread.name)  # Track completed threads
-
-    print(f"Thread Name: {current_thread.name}")
+    # Statistics reduced from the per-file results
+    total_events = 0
+    total_processing_time = 0.0
+    earliest_time = None
+    latest_time = None
+
+    print(f"Process Name: {multiprocessing.current_process().name}")
+
+    # Never more workers than files: idle processes still cost a spawn and an import
+    workers = min(MAX_WORKERS, len(objs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # ----------------------
+        # Phase 2: Task Submission
+        # ----------------------
+        futures = {}
+        for i, obj in enumerate(objs, 1):
+            # Extract filename from S3 key for logging
+            # (the last part of the path; a plain string split, no regex needed)
+            obj_name = obj["Key"].rsplit("/", 1)[-1]
+            if "." not in obj_name:
+                continue  # Skip if it's a directory (no file extension)
+
+            futures[pool.submit(process_object, obj)] = obj["Key"]
+            print(f"Submitted {obj_name}-{i} for {obj['Key']}")
+
+        # ----------------------
+        # Phase 3: Collect results as each file completes
+        # ----------------------
+        for fut in as_completed(futures):
+            key = futures[fut]
+            try:
+                out_path, events, proc_time, file_earliest, file_latest, worker = fut.result()
+            except Exception as e:
+                print(f"Failed processing {key}: {e}")
+                continue
+            print(f"Process Name: {worker} | Completed processing {key}: {events} events in {proc_time:.2f}s")
+            outputs.append(out_path)
+
+            total_events += events
+            total_processing_time += proc_time
+            if file_earliest is not None and (earliest_time is None or file_earliest < earliest_time):
+                earliest_time = file_earliest
+            if file_latest is not None and (latest_time is None or file_latest > latest_time):
+                latest_time = file_latest
 
     # ----------------------
     # Phase 4: Results and Statistics
@@ -351,7 +491,7 @@ def main():
 
     # Display comprehensive processing statistics
     if total_events > 0:
-        # Calculate overall throughput across all threads
+        # Calculate overall throughput across all workers
         overall_thr = (total_events / total_processing_time) if total_processing_time > 0 else 0.0
         
         print(f"----- SUMMARY -----")